@@ -1,13 +1,12 @@
 import argparse
+import functools
 import json
 import os
-from core.state import OpsGuardState
-from core.graph import build_graph
-from core.logger import log_event
-from core.workspace import cleanup_workspace
 
 
 def _extract_workspace_path(state_candidate) -> str | None:
+    from core.state import OpsGuardState
+
     if isinstance(state_candidate, OpsGuardState):
         return state_candidate.workspace_path
     if isinstance(state_candidate, dict):
@@ -15,6 +14,14 @@ def _extract_workspace_path(state_candidate) -> str | None:
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _state_constructor():
+    # Resolved once: pydantic v2 names it model_construct, v1 construct.
+    from core.state import OpsGuardState
+
+    return getattr(OpsGuardState, "model_construct", None) or OpsGuardState.construct
+
+
 def _print_change_summary(report: dict | None):
     print("\n====== CHANGES ======")
 
@@ -53,6 +60,12 @@ def _print_change_summary(report: dict | None):
 
 
 def run_command(repo_path: str, error_log: str, entry_file: str, mode: str):
+    # Imported lazily so `--help` does not pay for langgraph/openai imports.
+    from core.state import OpsGuardState
+    from core.graph import build_graph
+    from core.logger import log_event
+    from core.workspace import cleanup_workspace
+
     verbose = os.getenv("OPSGUARD_VERBOSE") == "1"
     log_event("CLI", "Starting OpsGuard run")
 
@@ -72,15 +85,14 @@ def run_command(repo_path: str, error_log: str, entry_file: str, mode: str):
 
     try:
         # Execute graph. LangGraph may return a raw dict state, so normalize it.
+        # Every field was already validated on the way through the graph, so
+        # the dict is wrapped without a second validation pass.
         raw_final_state = app.invoke(initial_state)
 
         if isinstance(raw_final_state, OpsGuardState):
             final_state = raw_final_state
         elif isinstance(raw_final_state, dict):
-            if hasattr(OpsGuardState, "model_validate"):
-                final_state = OpsGuardState.model_validate(raw_final_state)
-            else:
-                final_state = OpsGuardState.parse_obj(raw_final_state)
+            final_state = _state_constructor()(**raw_final_state)
         else:
             raise TypeError(
                 f"Unexpected graph state type: {type(raw_final_state).__name__}"
@@ -116,7 +128,8 @@ def run_command(repo_path: str, error_log: str, entry_file: str, mode: str):
             or initial_state.workspace_path
         )
 
-        if workspace_path:
+        # Nothing to clean up if the graph failed before creating it.
+        if workspace_path and os.path.isdir(workspace_path):
             log_event(
                 "CLI",
                 "Cleaning up workspace",
@@ -1,10 +1,53 @@
+import atexit
 import subprocess
+import threading
 import os
+from collections import deque
+from functools import lru_cache
 
 
-def execute_python(workspace_path: str, script_name: str) -> dict:
+DOCKER_IMAGE = "python:3.11-slim"
+PYTEST_IMAGE = "opsguard/py311-pytest:latest"
+DEFAULT_TIMEOUT = 300
+
+# Only the tail of each stream is kept: 16 chunks of 64 KiB = 1 MiB.
+_CHUNK_SIZE = 64 * 1024
+_MAX_CHUNKS = 16
+
+
+@lru_cache(maxsize=16)
+def _workspace_key(workspace_path: str) -> str:
+    # Workspaces are fixed for a run; skip the getcwd() in abspath per call.
+    return os.path.abspath(workspace_path)
+
+
+@lru_cache(maxsize=None)
+def _ensure_dir(path: str):
+    # Created at most once per process; a session restart skips the syscalls.
+    os.makedirs(path, exist_ok=True)
+
+
+def _pip_cache_dir() -> str:
+    # OpsGuard's own cache, never the host user's ~/.cache/pip: code in the
+    # sandbox can write to the mount, and the host's pip would reuse any
+    # wheels it planted there.
+    return os.path.join(os.getcwd(), "artifacts", "internal", "pip-cache")
+
+
+@lru_cache(maxsize=16)
+def _mount_args(workspace_path: str) -> tuple:
+    return ("-v", f"{_workspace_key(workspace_path)}:/app", "-w", "/app")
+
+
+def _drain(stream, buffer: deque):
+    for chunk in iter(lambda: stream.read(_CHUNK_SIZE), b""):
+        buffer.append(chunk)
+    stream.close()
+
+
+def _run_docker(docker_command: list, timeout: int) -> dict:
     """
-    Executes a Python script inside a Docker container.
+    Runs a docker command, streaming stdout/stderr into bounded buffers.
 
     Returns:
         {
@@ -14,40 +57,186 @@ def execute_python(workspace_path: str, script_name: str) -> dict:
         }
     """
 
-    # Ensure absolute path
-    workspace_path = os.path.abspath(workspace_path)
-
-    # Build Docker command
-    docker_command = [
-        "docker",
-        "run",
-        "--rm",
-        "-v",
-        f"{workspace_path}:/app",
-        "-w",
-        "/app",
-        "python:3.11-slim",
-        "python",
-        script_name
-    ]
-
-    # Execute Docker command
-    result = subprocess.run(
+    process = subprocess.Popen(
         docker_command,
-        capture_output=True,
-        text=True
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
     )
 
+    stdout_chunks = deque(maxlen=_MAX_CHUNKS)
+    stderr_chunks = deque(maxlen=_MAX_CHUNKS)
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, stdout_chunks), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr_chunks), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        exit_code = process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        process.kill()
+        exit_code = process.wait()
+
+    for reader in readers:
+        reader.join()
+
+    stdout = b"".join(stdout_chunks).decode("utf-8", errors="replace")
+    stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+
+    if timed_out:
+        stderr += f"\nDocker execution timed out after {timeout}s\n"
+
     return {
-        "exit_code": result.returncode,
-        "stdout": result.stdout,
-        "stderr": result.stderr
+        "exit_code": exit_code,
+        "stdout": stdout,
+        "stderr": stderr
     }
 
 
-def execute_pytest(workspace_path: str) -> dict:
+@lru_cache(maxsize=None)
+def image_available(image: str) -> bool:
+    """
+    Returns True if the image exists locally. Checked once per process.
+    """
+    try:
+        result = subprocess.run(
+            ["docker", "image", "inspect", image],
+            capture_output=True,
+        )
+    except OSError:
+        return False
+    return result.returncode == 0
+
+
+def _default_image() -> str:
+    # The pytest image is python:3.11-slim plus pytest, so it can serve
+    # entry-mode runs as well.
+    if image_available(PYTEST_IMAGE):
+        return PYTEST_IMAGE
+    return DOCKER_IMAGE
+
+
+class DockerSession:
+    """
+    A long-lived sandbox container bound to one workspace.
+
+    The container is started once with `sleep infinity` and every
+    execution goes through `docker exec`, so the reproduce -> patch ->
+    retest loop pays the container start-up cost only once.
     """
-    Runs the pytest suite inside a Docker container.
+
+    def __init__(self, workspace_path: str, image: str = None):
+        self.workspace_path = _workspace_key(workspace_path)
+        self.image = image or _default_image()
+        self.container_id = None
+        self.pytest_ready = self.image == PYTEST_IMAGE
+
+    def start(self):
+        docker_command = [
+            "docker",
+            "run",
+            "-d",
+            "--rm",
+            *_mount_args(self.workspace_path),
+        ]
+
+        # Without the prebuilt image, keep a pip cache across runs so the
+        # pytest install does not hit the network every time.
+        if self.image != PYTEST_IMAGE:
+            pip_cache_dir = _pip_cache_dir()
+            _ensure_dir(pip_cache_dir)
+            docker_command += ["-v", f"{pip_cache_dir}:/root/.cache/pip"]
+
+        docker_command += [
+            self.image,
+            "sleep",
+            "infinity",
+        ]
+
+        result = _run_docker(docker_command, DEFAULT_TIMEOUT)
+
+        if result["exit_code"] != 0:
+            raise RuntimeError(
+                f"Failed to start sandbox container: {result['stderr'].strip()}"
+            )
+
+        self.container_id = result["stdout"].strip()
+
+    def exec(self, command: list, timeout: int = DEFAULT_TIMEOUT) -> dict:
+        if self.container_id is None:
+            self.start()
+
+        result = _run_docker(
+            ["docker", "exec", self.container_id, *command],
+            timeout,
+        )
+
+        # A timed-out process may still be running inside the container;
+        # drop the container so the next call starts from a clean one.
+        if result["exit_code"] == -9:
+            self.close()
+
+        return result
+
+    def close(self):
+        if self.container_id is None:
+            return
+
+        subprocess.run(
+            ["docker", "rm", "-f", self.container_id],
+            capture_output=True,
+        )
+        self.container_id = None
+        self.pytest_ready = self.image == PYTEST_IMAGE
+
+
+_sessions = {}
+
+
+def get_session(workspace_path: str) -> DockerSession:
+    key = _workspace_key(workspace_path)
+    if key not in _sessions:
+        _sessions[key] = DockerSession(key)
+    return _sessions[key]
+
+
+def close_session(workspace_path: str):
+    session = _sessions.pop(_workspace_key(workspace_path), None)
+    if session is not None:
+        session.close()
+
+
+def close_all_sessions():
+    for workspace_path in list(_sessions):
+        close_session(workspace_path)
+
+
+atexit.register(close_all_sessions)
+
+
+def execute_python(workspace_path: str, script_name: str, timeout: int = DEFAULT_TIMEOUT) -> dict:
+    """
+    Executes a Python script inside the workspace's sandbox container.
+
+    Returns:
+        {
+            "exit_code": int,
+            "stdout": str,
+            "stderr": str
+        }
+    """
+
+    return get_session(workspace_path).exec(["python", script_name], timeout)
+
+
+def execute_pytest(workspace_path: str, timeout: int = DEFAULT_TIMEOUT) -> dict:
+    """
+    Runs the pytest suite inside the workspace's sandbox container.
+
+    pytest is installed at most once per container.
 
     Returns:
         {
@@ -57,30 +246,24 @@ def execute_pytest(workspace_path: str) -> dict:
         }
     """
 
-    workspace_path = os.path.abspath(workspace_path)
-
-    docker_command = [
-        "docker",
-        "run",
-        "--rm",
-        "-v",
-        f"{workspace_path}:/app",
-        "-w",
-        "/app",
-        "python:3.11-slim",
-        "bash",
-        "-c",
-        "pip install pytest --quiet && pytest"
-    ]
+    session = get_session(workspace_path)
 
-    result = subprocess.run(
-        docker_command,
-        capture_output=True,
-        text=True
-    )
+    if not session.pytest_ready:
+        # Probe and install in one exec; the install only runs when the
+        # import fails.
+        install = session.exec(
+            [
+                "sh",
+                "-c",
+                "python -c 'import pytest' 2>/dev/null || pip install pytest --quiet",
+            ],
+            timeout,
+        )
+        if install["exit_code"] != 0:
+            return install
+        session.pytest_ready = True
 
-    return {
-        "exit_code": result.returncode,
-        "stdout": result.stdout,
-        "stderr": result.stderr
-    }
+    # Only pass/fail feeds the retry loop, so stop at the first failing
+    # test; skipping the cache plugin keeps .pytest_cache out of the
+    # mounted workspace.
+    return session.exec(["pytest", "-x", "-p", "no:cacheprovider"], timeout)
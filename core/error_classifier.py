@@ -1,3 +1,30 @@
+import re
+
+
+# Infra-related keywords
+INFRA_KEYWORDS = [
+    "401",
+    "403",
+    "unauthorized",
+    "forbidden",
+    "rate limit",
+    "timeout",
+    "connection refused",
+    "connectionerror",
+    "network is unreachable",
+    "ssl error",
+    "credential",
+    "access denied"
+]
+
+# Single case-insensitive alternation so stderr is scanned once, without
+# building a lowercased copy of it.
+_INFRA_RE = re.compile(
+    "|".join(re.escape(keyword) for keyword in INFRA_KEYWORDS),
+    re.IGNORECASE,
+)
+
+
 def classify_error(stderr: str) -> dict:
     """
     Classifies the error based on stderr output.
@@ -15,30 +42,14 @@ def classify_error(stderr: str) -> dict:
             "reason": "No error detected."
         }
 
-    stderr_lower = stderr.lower()
-
-    # Infra-related keywords
-    infra_keywords = [
-        "401",
-        "403",
-        "unauthorized",
-        "forbidden",
-        "rate limit",
-        "timeout",
-        "connection refused",
-        "connectionerror",
-        "network is unreachable",
-        "ssl error",
-        "credential",
-        "access denied"
-    ]
-
-    for keyword in infra_keywords:
-        if keyword in stderr_lower:
-            return {
-                "type": "INFRA_ERROR",
-                "reason": f"Detected infrastructure-related keyword: {keyword}"
-            }
+    match = _INFRA_RE.search(stderr)
+    if match:
+        # The match is a keyword up to case; report it as listed.
+        keyword = match.group(0).lower()
+        return {
+            "type": "INFRA_ERROR",
+            "reason": f"Detected infrastructure-related keyword: {keyword}"
+        }
 
     # If no infra keywords found, assume code error
     return {
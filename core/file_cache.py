@@ -0,0 +1,32 @@
+import os
+
+
+# path -> (st_mtime_ns, st_size, text); reused while the file is unchanged.
+_CACHE = {}
+
+
+def read_cached(path: str) -> str:
+    """
+    Returns the file's text, re-reading it only when its mtime or size
+    has changed since the last read or write through this module.
+    """
+    stat = os.stat(path)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    _CACHE[path] = (stat.st_mtime_ns, stat.st_size, text)
+    return text
+
+
+def write_cached(path: str, text: str):
+    """
+    Writes `text` and records it against the new stat, so the next
+    read_cached() of the path is served from memory.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    stat = os.stat(path)
+    _CACHE[path] = (stat.st_mtime_ns, stat.st_size, text)
@@ -1,5 +1,14 @@
+import functools
+import hashlib
+
 from langgraph.graph import StateGraph, END
 
+try:
+    from langgraph.cache.memory import InMemoryCache
+    from langgraph.types import CachePolicy
+except ImportError:  # node caching needs a newer langgraph; run uncached
+    InMemoryCache = CachePolicy = None
+
 from core.state import OpsGuardState, Status, ErrorType
 from core.nodes import (
     classify_error_node,
@@ -18,11 +27,60 @@ from core.nodes import (
     generate_final_report_node,
 )
 
+def _error_log_cache_key(state: OpsGuardState) -> str:
+    # Explicit key: pickling the pydantic state would hash every field.
+    return hashlib.blake2b(state.error_log.encode(), digest_size=16).hexdigest()
+
+
+# Routers live at module scope so they are defined once per process.
+# Enum members are singletons, so identity compares are enough.
+
+# Early validation: if entry file is missing, skip straight to final report
+def setup_router(state: OpsGuardState):
+    if state.status is Status.FAILED:
+        return "generate_final_report"
+    return "generate_reproduction_script"
+
+
+def reproduction_router(state: OpsGuardState):
+    if state.error_type is ErrorType.INFRA_ERROR:
+        return "generate_infra_report"
+
+    if state.reproduction_verified:
+        return "generate_patch"
+
+    if state.reproduce_retries >= 2:
+        return "generate_not_reproducible"
+
+    return "generate_reproduction_script"
+
+
+def fix_router(state: OpsGuardState):
+    if state.status is Status.SUCCESS:
+        return "generate_final_report"
+    if state.fix_retries >= 3:
+        return "generate_fail_report"
+    return "generate_patch"
+
+
+@functools.lru_cache(maxsize=1)
 def build_graph():
+    """
+    Builds and compiles the OpsGuard state machine.
+
+    The compiled graph only depends on static node definitions, so it is
+    built once per process and reused across invocations.
+    """
     graph = StateGraph(OpsGuardState)
 
+    # classify_error only depends on error_log and only writes error_type,
+    # so its result can be replayed when a retry reproduces the same stderr.
+    classify_cache = {}
+    if CachePolicy is not None:
+        classify_cache["cache_policy"] = CachePolicy(key_func=_error_log_cache_key)
+
     # Nodes
-    graph.add_node("classify_error", classify_error_node)
+    graph.add_node("classify_error", classify_error_node, **classify_cache)
     graph.add_node("generate_infra_report", generate_infra_report_node)
 
     graph.add_node("setup_workspace", setup_workspace_node)
@@ -44,12 +102,6 @@ def build_graph():
 
     graph.add_edge("generate_infra_report", "generate_final_report")
 
-    # Early validation: if entry file is missing, skip straight to final report
-    def setup_router(state: OpsGuardState):
-        if state.status == Status.FAILED:
-            return "generate_final_report"
-        return "generate_reproduction_script"
-
     graph.add_conditional_edges(
         "setup_workspace",
         setup_router,
@@ -64,19 +116,6 @@ def build_graph():
     graph.add_edge("execute_reproduction", "classify_error")
     graph.add_edge("classify_error", "reproduction_decision")
 
-    def reproduction_router(state: OpsGuardState):
-        if state.error_type == ErrorType.INFRA_ERROR:
-            return "generate_infra_report"
-
-        if state.reproduction_verified:
-            return "generate_patch"
-
-        if state.reproduce_retries >= 2:
-            return "generate_not_reproducible"
-
-        return "generate_reproduction_script"
-
-
     graph.add_conditional_edges(
         "reproduction_decision",
         reproduction_router,
@@ -95,13 +134,6 @@ def build_graph():
     graph.add_edge("syntax_check", "execute_fix_test")
     graph.add_edge("execute_fix_test", "fix_decision")
 
-    def fix_router(state: OpsGuardState):
-        if state.status == Status.SUCCESS:
-            return "generate_final_report"
-        if state.fix_retries >= 3:
-            return "generate_fail_report"
-        return "generate_patch"
-
     graph.add_conditional_edges(
         "fix_decision",
         fix_router,
@@ -116,4 +148,6 @@ def build_graph():
     graph.add_edge("generate_not_reproducible", "generate_final_report")
     graph.add_edge("generate_final_report", END)
 
+    if InMemoryCache is not None:
+        return graph.compile(cache=InMemoryCache())
     return graph.compile()
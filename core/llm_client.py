@@ -1,49 +1,205 @@
 import os
 import ast
+import codeop
 import re
-from openai import OpenAI
-from dotenv import load_dotenv
 
-load_dotenv()
+NVIDIA_BASE_URL = "https://integrate.api.nvidia.com/v1"
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
 
-NVIDIA_API_KEY = os.getenv("NVIDIA_API_KEY")
-
-client = OpenAI(
-    base_url="https://integrate.api.nvidia.com/v1",
-    api_key=NVIDIA_API_KEY,
+# Prose markers that mean the LLM wrapped the code in an explanation.
+_EXPLANATION_RE = re.compile(
+    r"here is|fixed code|updated code|explanation|this fixes|the issue",
+    re.IGNORECASE,
 )
 
 
-def call_nvidia_llm(messages):
-    completion = client.chat.completions.create(
-        model="meta/llama-3.1-70b-instruct",
-        messages=messages,
-        temperature=0.2,
-        top_p=0.9,
-        stream=False,  # IMPORTANT
+# Enough trailing context to match any _EXPLANATION_RE marker split
+# across two streamed chunks.
+_STREAM_TAIL = 16
+
+NVIDIA_MODEL = "meta/llama-3.1-70b-instruct"
+# Groq models by tier: the 8B model answers simple fixes several times
+# faster; the 70B model is the escalation target.
+GROQ_MODELS = {
+    "instant": "llama-3.1-8b-instant",
+    "versatile": "llama-3.3-70b-versatile",
+}
+
+# Largest max_tokens each model accepts; a request above it is rejected
+# outright rather than truncated. Unlisted models get the smallest cap.
+MAX_OUTPUT_TOKENS = {
+    NVIDIA_MODEL: 4096,
+    GROQ_MODELS["instant"]: 131072,
+    GROQ_MODELS["versatile"]: 32768,
+}
+_DEFAULT_MAX_OUTPUT_TOKENS = 4096
+
+# Once this many characters have streamed, the first line is checked for
+# prose (e.g. "Sure, the bug is ...") so the call can stop early.
+_LEAD_CHARS = 128
+
+_clients = {}
+
+
+def _build_http_client():
+    """
+    One pooled HTTP client per provider, so retries against the same host
+    reuse the TCP/TLS connection. HTTP/2 is enabled when `h2` is installed.
+    """
+    import httpx
+
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(max_keepalive_connections=4, keepalive_expiry=60),
+        timeout=httpx.Timeout(60.0, connect=5.0),
     )
 
-    return completion.choices[0].message.content
 
+def _get_client(name: str):
+    """
+    Lazily constructs the OpenAI-compatible clients on first use so that
+    importing this module does not pull in openai/dotenv.
+    """
+    if name not in _clients:
+        from openai import OpenAI
+        from dotenv import load_dotenv
+
+        load_dotenv()
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+        if name == "client":
+            _clients[name] = OpenAI(
+                base_url=NVIDIA_BASE_URL,
+                api_key=os.getenv("NVIDIA_API_KEY"),
+                http_client=_build_http_client(),
+            )
+        elif name == "groq_client":
+            _clients[name] = OpenAI(
+                base_url=GROQ_BASE_URL,
+                api_key=os.getenv("GROQ_API_KEY"),
+                http_client=_build_http_client(),
+            )
+        else:
+            raise KeyError(name)
 
-groq_client = OpenAI(
-    base_url="https://api.groq.com/openai/v1",
-    api_key=GROQ_API_KEY,
-)
+    return _clients[name]
+
+
+def __getattr__(name):
+    if name in ("client", "groq_client"):
+        return _get_client(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def call_groq_llm(messages):
-    completion = groq_client.chat.completions.create(
-        model="llama-3.3-70b-versatile",
+def _starts_with_prose(text: str) -> bool:
+    """
+    True when the first complete non-fence line of `text` cannot begin a
+    Python statement. Incomplete openers such as `def f():` are code.
+    """
+    for line in text.split("\n")[:-1]:
+        line = line.strip()
+        if not line or line.startswith("```"):
+            continue
+        try:
+            codeop.compile_command(line, "<llm>", "exec")
+        except (SyntaxError, ValueError, OverflowError):
+            return True
+        return False
+    return False
+
+
+def _stream_completion(llm_client, model: str, messages, max_chars: int = None, cancel=None) -> str:
+    """
+    Streams a completion and stops as soon as explanation prose shows up,
+    when the response opens with prose instead of code, once the output
+    grows past `max_chars`, or when the `cancel` event (a threading.Event)
+    is set by a caller that no longer needs the answer.
+
+    validate_llm_patch() rejects such output anyway, so there is no point
+    waiting for the rest of the tokens. The partial text is returned so the
+    caller's validator and reprompt flow still see what the model produced.
+    """
+    options = {}
+    if max_chars is not None:
+        # Code runs well over 3 characters per token, so this cap sits just
+        # past the client-side cutoff while still bounding what the server
+        # reserves and generates. A whole large file can push it past what
+        # the model allows, so it is clamped to the model's output limit.
+        options["max_tokens"] = min(
+            max_chars // 3,
+            MAX_OUTPUT_TOKENS.get(model, _DEFAULT_MAX_OUTPUT_TOKENS),
+        )
+
+    if cancel is not None:
+        # Raced calls are not retried: the other provider covers a failed
+        # call, and a retry started after the race is decided would only
+        # keep an abandoned request alive.
+        llm_client = llm_client.with_options(max_retries=0)
+
+    stream = llm_client.chat.completions.create(
+        model=model,
         messages=messages,
         temperature=0.2,
         top_p=0.9,
-        stream=False,
+        stream=True,
+        **options,
     )
 
-    return completion.choices[0].message.content
+    parts = []
+    tail = ""
+    total = 0
+    lead_checked = False
+    try:
+        for chunk in stream:
+            if cancel is not None and cancel.is_set():
+                break
+            if not chunk.choices:
+                continue
+            piece = chunk.choices[0].delta.content
+            if not piece:
+                continue
+
+            parts.append(piece)
+            window = tail + piece
+            if _EXPLANATION_RE.search(window):
+                break
+            total += len(piece)
+            if not lead_checked and total >= _LEAD_CHARS:
+                lead_checked = True
+                if _starts_with_prose("".join(parts)):
+                    break
+            if max_chars is not None and total > max_chars:
+                break
+            tail = window[-_STREAM_TAIL:]
+    finally:
+        stream.close()
+
+    return "".join(parts)
+
+
+def call_nvidia_llm(messages, max_chars: int = None, model: str = NVIDIA_MODEL, cancel=None):
+    return _stream_completion(
+        _get_client("client"),
+        model,
+        messages,
+        max_chars,
+        cancel,
+    )
+
+
+def call_groq_llm(messages, max_chars: int = None, model: str = GROQ_MODELS["versatile"], cancel=None):
+    return _stream_completion(
+        _get_client("groq_client"),
+        model,
+        messages,
+        max_chars,
+        cancel,
+    )
 
 
 def generate_patch_from_llm(messages):
@@ -55,30 +211,25 @@ def generate_patch_from_llm(messages):
         return call_groq_llm(messages)
 
 
-def validate_llm_patch(content: str) -> bool:
+def parse_llm_patch(content: str):
     """
     Strict validation to ensure LLM returned only raw Python code.
+
+    Returns the parsed module so callers can reuse it, or None when the
+    content is rejected. Cheap lexical checks run first so obvious
+    rejections skip ast.parse().
     """
     if "```" in content:
-        return False
+        return None
 
-    explanation_patterns = [
-        r"here is",
-        r"fixed code",
-        r"updated code",
-        r"explanation",
-        r"this fixes",
-        r"the issue",
-    ]
-
-    lower_content = content.lower()
-    for pattern in explanation_patterns:
-        if re.search(pattern, lower_content):
-            return False
+    if _EXPLANATION_RE.search(content):
+        return None
 
     try:
-        ast.parse(content)
+        return ast.parse(content)
     except SyntaxError:
-        return False
+        return None
 
-    return True
+
+def validate_llm_patch(content: str) -> bool:
+    return parse_llm_patch(content) is not None
@@ -1,7 +1,15 @@
+import atexit
 import logging
+import logging.handlers
 import json
 import os
-from datetime import datetime
+import queue
+import time
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is the fallback
+    orjson = None
 
 logger = logging.getLogger("opsguard")
 logger.setLevel(logging.INFO)
@@ -19,21 +27,76 @@ file_handler.setLevel(logging.INFO)
 formatter = logging.Formatter('%(message)s')
 file_handler.setFormatter(formatter)
 
-if not logger.handlers:
-    logger.addHandler(file_handler)
+handlers = [file_handler]
 
 if os.getenv("OPSGUARD_VERBOSE") == "1":
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(logging.INFO)
     stream_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
+    handlers.append(stream_handler)
+
+# Nodes only enqueue records; a background listener does the file/stream IO.
+if not logger.handlers:
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        *handlers,
+        respect_handler_level=True,
+    )
+    listener.start()
+    atexit.register(listener.stop)
+
+
+# Long strings (diffs, pytest output) are clipped before encoding.
+_MAX_FIELD = 4096
+
+
+def _cap_fields(data: dict) -> dict:
+    if not any(isinstance(v, str) and len(v) > _MAX_FIELD for v in data.values()):
+        return data
+
+    capped = {}
+    for key, value in data.items():
+        if isinstance(value, str) and len(value) > _MAX_FIELD:
+            value = f"{value[:_MAX_FIELD]}...[+{len(value) - _MAX_FIELD} chars]"
+        capped[key] = value
+    return capped
+
+
+def _dumps(payload: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(payload)
+
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") of the last timestamp formatted.
+_second_prefix = (None, "")
+
+
+def _timestamp() -> str:
+    """
+    UTC ISO-8601 timestamp; the date/time part is formatted once per second.
+    """
+    global _second_prefix
+
+    now_ns = time.time_ns()
+    second, remainder = divmod(now_ns, 1_000_000_000)
+
+    cached_second, prefix = _second_prefix
+    if cached_second != second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        _second_prefix = (second, prefix)
+
+    return f"{prefix}.{remainder // 1000:06d}"
 
 
 def log_event(node: str, message: str, data: dict = None):
     payload = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _timestamp(),
         "node": node,
         "message": message,
-        "data": data or {}
+        "data": _cap_fields(data) if data else {}
     }
-    logger.info(json.dumps(payload))
+    logger.info(_dumps(payload))
@@ -1,32 +1,406 @@
 from core.state import OpsGuardState, Status, ErrorType
 from core.workspace import create_workspace
 from core.docker_executor import execute_python
-from core.patch_engine import apply_full_file_patch
+from core.patch_engine import apply_full_file_patch, trim_common_lines
 from core.error_classifier import classify_error
-import ast
-import difflib
+from core.file_cache import read_cached
+import functools
+import hashlib
 import os
 import json
-import subprocess
+import re
 import sys
-from datetime import datetime
-
+import textwrap
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; stdlib json is the fallback
+    orjson = None
+
+if TYPE_CHECKING:
+    import ast
 
 from core.logger import log_event
 
-def classify_error_node(state: OpsGuardState) -> OpsGuardState:
+# Kept short: prompt length drives time-to-first-token on both providers.
+_SYSTEM_PROMPT = (
+    "Fix only the runtime error with the smallest change. "
+    "Keep all other code, including the __main__ block. "
+    "No new third-party imports. "
+    "Return only the full corrected Python file, no markdown or explanations."
+)
+# Used instead when the prompt carries only the definition the error is in.
+_SCOPE_SYSTEM_PROMPT = (
+    "Fix only the runtime error with the smallest change. "
+    "No new third-party imports. "
+    "You are given the file outline and the one definition the error points to. "
+    "Return only that full corrected definition, no markdown or explanations."
+)
+_MAX_ERROR_LOG_CHARS = 2000
+_REPROMPT_RULES = (
+    "Return ONLY raw Python code for the full corrected file. "
+    "Do not drop unrelated functions/classes from the original file. "
+    "Preserve all existing functions/classes unless required for the fix. "
+    "Do not include explanations or markdown."
+)
+_SCOPE_REPROMPT_RULES = (
+    "Return ONLY raw Python code for the full corrected definition. "
+    "Keep its name, signature and decorators. "
+    "Do not include explanations or markdown."
+)
+
+# Files longer than this are sent as the failing definition plus an
+# outline; the reply is spliced back into the original file.
+_LOCALIZE_MIN_CHARS = 4000
+
+# NVIDIA is asked first; Groq is only raced in if NVIDIA has not produced
+# an accepted answer within this window. OPSGUARD_PROVIDER_RACE=0 turns the
+# race off: Groq is then only called once NVIDIA has failed or been rejected.
+_HEAD_START_SECONDS = 0.15
+
+# Imports the LLM may add freely; anything else is a new dependency.
+_STDLIB_MODULES = frozenset(getattr(sys, "stdlib_module_names", ())) | frozenset(
+    sys.builtin_module_names
+)
+
+# (patch, model) for LLM patches that passed the fix test, keyed by blake2b
+# of the prompt inputs, in LRU order; backed by the on-disk cache below.
+_PATCH_CACHE_SIZE = 128
+_PATCH_CACHE = OrderedDict()
+
+
+@functools.lru_cache(maxsize=1)
+def _artifact_dirs() -> tuple[str, str, str]:
+    """
+    Returns (artifacts, internal, presentation) under the working directory
+    of the first write, creating them once per process.
+    """
+    artifacts_dir = os.path.join(os.getcwd(), "artifacts")
+    internal_dir = os.path.join(artifacts_dir, "internal")
+    presentation_dir = os.path.join(artifacts_dir, "presentation")
+    os.makedirs(internal_dir, exist_ok=True)
+    os.makedirs(presentation_dir, exist_ok=True)
+    return artifacts_dir, internal_dir, presentation_dir
+
+
+# Patches that passed the fix test also persist across CLI runs, each of
+# which is a new process, in internal/llm_cache.sqlite; rows older than the
+# TTL are ignored and pruned on write.
+_PATCH_DB_TTL_SECONDS = 24 * 60 * 60
+
+# blake2b digest of the content last written to internal/latest_patch.py.
+_LAST_PATCH_HASH = None
+
+_UTC = timezone.utc
+
+
+@functools.lru_cache(maxsize=1)
+def _patch_db():
+    import sqlite3
+
+    _, internal_dir, _ = _artifact_dirs()
+    db = sqlite3.connect(
+        os.path.join(internal_dir, "llm_cache.sqlite"),
+        check_same_thread=False,
+    )
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS patches "
+        "(key TEXT PRIMARY KEY, patch TEXT NOT NULL, created_at REAL NOT NULL, model TEXT)"
+    )
+    try:
+        # Tables written before the model was recorded; their rows load
+        # with no model.
+        db.execute("ALTER TABLE patches ADD COLUMN model TEXT")
+    except sqlite3.OperationalError:
+        pass
+    return db
+
+
+def _remember_patch(key: str, patch: str, model: str | None):
+    _PATCH_CACHE[key] = (patch, model)
+    _PATCH_CACHE.move_to_end(key)
+    if len(_PATCH_CACHE) > _PATCH_CACHE_SIZE:
+        _PATCH_CACHE.popitem(last=False)
+
+
+def _load_cached_patch(key: str) -> tuple[str, str | None] | None:
+    """
+    Returns (patch, model) for a verified patch cached under `key`, or None.
+    """
+    cached = _PATCH_CACHE.get(key)
+    if cached is not None:
+        _PATCH_CACHE.move_to_end(key)
+        return cached
+
+    import sqlite3
+
+    try:
+        row = _patch_db().execute(
+            "SELECT patch, model FROM patches WHERE key = ? AND created_at > ?",
+            (key, time.time() - _PATCH_DB_TTL_SECONDS),
+        ).fetchone()
+    except sqlite3.Error:
+        # The on-disk cache is an optimization; a locked or unreadable
+        # database just means asking the LLM.
+        return None
+    if row is None:
+        return None
+
+    _remember_patch(key, row[0], row[1])
+    return row[0], row[1]
+
+
+def _store_patch(key: str, patch: str, model: str | None):
+    _remember_patch(key, patch, model)
+
+    import sqlite3
+
+    now = time.time()
+    try:
+        db = _patch_db()
+        with db:
+            db.execute(
+                "DELETE FROM patches WHERE created_at <= ?",
+                (now - _PATCH_DB_TTL_SECONDS,),
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO patches (key, patch, created_at, model) "
+                "VALUES (?, ?, ?, ?)",
+                (key, patch, now, model),
+            )
+    except sqlite3.Error:
+        pass
+
+
+def _forget_patch(key: str):
+    _PATCH_CACHE.pop(key, None)
+
+    import sqlite3
+
+    try:
+        db = _patch_db()
+        with db:
+            db.execute("DELETE FROM patches WHERE key = ?", (key,))
+    except sqlite3.Error:
+        pass
+
+
+def _dump_report(report: dict) -> bytes | str:
+    # orjson bytes are written as-is, skipping a decode/encode round trip.
+    if orjson is not None:
+        return orjson.dumps(report, option=orjson.OPT_INDENT_2)
+    return json.dumps(report, indent=2)
+
+
+def _write_file(path: str, content: bytes | str):
+    if isinstance(content, bytes):
+        with open(path, "wb") as f:
+            f.write(content)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def _submit_daemon(fn, *args) -> Future:
+    """
+    Runs fn(*args) on a daemon thread. Unlike ThreadPoolExecutor workers,
+    which interpreter exit joins, a call still waiting on the network does
+    not hold up exit once nobody needs its result.
+    """
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _write_files(files: dict):
+    """
+    Writes {path: content} concurrently; file IO releases the GIL.
+    """
+    with ThreadPoolExecutor(max_workers=len(files)) as pool:
+        # list() re-raises the first failed write.
+        list(pool.map(_write_file, files.keys(), files.values()))
+
+
+# Markdown code fences, stripped from LLM output in one pass.
+_FENCE_RE = re.compile(r"```(?:python)?")
+
+# Unindented def/async def/class statements, i.e. top-level symbols.
+_TOP_LEVEL_DEF_RE = re.compile(
+    r"^(async[ \t]+def|def|class)[ \t]+(\w+)",
+    re.MULTILINE,
+)
+_SYMBOL_KINDS = {"def": "function", "async def": "async_function", "class": "class"}
+
+
+@functools.lru_cache(maxsize=8)
+def extract_top_level_symbols(source: str) -> frozenset[tuple[str, str]]:
+    """
+    Top-level (kind, name) pairs found by a line-start regex scan.
+
+    Much cheaper than ast.parse; the truncation check only compares the
+    original and candidate sets, so an occasional match inside a
+    multi-line string affects both sides equally.
+    """
+    return frozenset(
+        (_SYMBOL_KINDS[" ".join(keyword.split())], name)
+        for keyword, name in _TOP_LEVEL_DEF_RE.findall(source)
+    )
+
+
+# Fields that hold nested statement lists (ExceptHandler and match_case
+# nodes carry their own `body`).
+_STATEMENT_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+def import_roots(tree: "ast.Module") -> set[str]:
+    """
+    Root module names of every import statement, however deeply nested.
+
+    Only statement lists are traversed: imports are statements, so the
+    expression nodes that make up most of the tree are never visited.
+    Function and class bodies are still searched, since a lazy import
+    there is as much a new dependency as a top-level one.
+    """
+    import ast
+
+    roots = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                roots.add(alias.name.split(".")[0])
+            continue
+        if isinstance(node, ast.ImportFrom):
+            if node.level == 0 and node.module:
+                roots.add(node.module.split(".")[0])
+            continue
+        for field in _STATEMENT_FIELDS:
+            children = getattr(node, field, None)
+            if children:
+                stack.extend(children)
+    return roots
+
+
+def bracket_balance(source: str) -> tuple[int, int, int, int]:
+    """
+    Open-minus-close counts for (), [] and {}, plus triple-quote parity.
+
+    Compared against the original file rather than zero, so brackets
+    inside string literals that a fix leaves alone do not cause rejects.
+    """
+    return (
+        source.count("(") - source.count(")"),
+        source.count("[") - source.count("]"),
+        source.count("{") - source.count("}"),
+        (source.count('"""') + source.count("'''")) % 2,
+    )
+
+
+def count_line_changes(original_lines: list, candidate_lines: list) -> tuple[int, int]:
+    """
+    Returns (removed, added) line counts between two versions of a file.
+
+    The common prefix and suffix are stripped first, and the middle is
+    compared as multisets of lines. That is linear, unlike SequenceMatcher,
+    and close enough for spotting large one-way deletions.
+    """
+    start, end_original, end_candidate = trim_common_lines(original_lines, candidate_lines)
+
+    if start == end_original or start == end_candidate:
+        return end_original - start, end_candidate - start
+
+    original_counts = Counter(original_lines[start:end_original])
+    candidate_counts = Counter(candidate_lines[start:end_candidate])
+    common = (original_counts & candidate_counts).total()
+    return (end_original - start) - common, (end_candidate - start) - common
+
+
+_TRACEBACK_FRAME_RE = re.compile(r'File "([^"]+)", line (\d+)')
+
+
+def extract_relevant_scope(
+    tree: "ast.Module", error_log: str, entry_file: str
+) -> tuple[int, int, int] | None:
+    """
+    Locates the definition the error points to.
+
+    Returns (start, end, col_offset) for the innermost def or class that
+    contains the last traceback line in `entry_file`: start/end slice the
+    file's lines (decorators included). None when no frame is in the
+    entry file or the line is at module level.
+    """
+    import ast
+
+    entry = entry_file.replace("\\", "/")
+    line_number = None
+    for path, line in _TRACEBACK_FRAME_RE.findall(error_log):
+        path = path.replace("\\", "/")
+        if path == entry or path.endswith("/" + entry):
+            line_number = int(line)
+    if line_number is None:
+        return None
+
+    scope = None
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno, *(d.lineno for d in node.decorator_list)]) - 1
+        # Definitions nest, so the containing one that starts last is innermost.
+        if start < line_number <= node.end_lineno and (scope is None or start > scope[0]):
+            scope = (start, node.end_lineno, node.col_offset)
+    return scope
+
+
+def scope_outline(tree: "ast.Module", lines: list, start: int, end: int) -> str:
+    """
+    Import statements and def/class header lines outside lines[start:end],
+    so a localized prompt still shows what the definition can refer to.
+    """
+    import ast
+
+    outline = set()
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            outline.update(range(node.lineno - 1, node.end_lineno))
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            outline.add(node.lineno - 1)
+    return "\n".join(
+        lines[index] for index in sorted(outline) if not start <= index < end
+    )
+
+
+def classify_error_node(state: OpsGuardState) -> dict:
+    # Returns a partial update so a cached result never overwrites
+    # counters or paths with stale values.
     log_event("classify_error", "Starting error classification")
 
     result = classify_error(state.error_log)
-    state.error_type = ErrorType(result["type"])
+    error_type = ErrorType(result["type"])
 
     log_event(
         "classify_error",
         "Error classified",
-        {"error_type": state.error_type.value}
+        {"error_type": error_type.value}
     )
 
-    return state
+    return {"error_type": error_type}
 
 
 def generate_infra_report_node(state: OpsGuardState) -> OpsGuardState:
@@ -144,99 +518,154 @@ def generate_patch_node(state: OpsGuardState) -> OpsGuardState:
     )
 
     original_file_path = os.path.join(state.workspace_path, state.entry_file)
-    with open(original_file_path, "r", encoding="utf-8") as f:
-        original_code = f.read()
+    original_code = read_cached(original_file_path)
 
-    messages = [
-        {
-            "role": "system",
-            "content": (
-                "You are a senior Python engineer. "
-                "Fix ONLY the runtime error shown. "
-                "Make the smallest possible change required to stop the crash. "
-                "Do not refactor unrelated logic. "
-                "Do not add new third-party imports or environment checks. "
-                "Do not modify the __main__ block unless the crash is there. "
-                "Return ONLY the full updated file. "
-                "No explanations. No markdown."
-            ),
-        },
-        {
-            "role": "user",
-            "content": f"""
-Error:
-{state.error_log}
+    # Imported here so CLI runs that never reach the patch step skip it.
+    import ast
 
-Original File:
-{original_code}
+    def has_new_third_party_imports(candidate_tree: ast.Module) -> tuple[bool, list[str]]:
+        # Pure set algebra against the precomputed original/stdlib roots.
+        third_party_imports = sorted(
+            import_roots(candidate_tree) - allowed_imports
+        )
+        return bool(third_party_imports), third_party_imports
 
-Fix the bug and return the full corrected file.
-""",
-        },
-    ]
+    # Everything derived from the original file is computed once per node
+    # run, not once per provider attempt.
+    original_lines = original_code.splitlines()
+    original_symbols = extract_top_level_symbols(original_code)
+    original_balance = bracket_balance(original_code)
+    try:
+        original_tree = ast.parse(original_code)
+    except SyntaxError:
+        original_tree = None
+    original_imports = (
+        frozenset(import_roots(original_tree)) if original_tree is not None else frozenset()
+    )
+    # "" can never be a real module root; listing it keeps it out of reports.
+    allowed_imports = original_imports | _STDLIB_MODULES | {""}
+
+    # Prompt size drives LLM latency, so a large file is cut down to the
+    # definition the traceback points at; the reply is spliced back in and
+    # the whole file is validated as usual.
+    scope = None
+    if original_tree is not None and len(original_code) > _LOCALIZE_MIN_CHARS:
+        scope = extract_relevant_scope(original_tree, state.error_log, state.entry_file)
+    if scope is not None:
+        scope_start, scope_end, scope_col = scope
+        scope_indent = original_lines[scope_start][:scope_col]
+        scope_lines = original_lines[scope_start:scope_end]
+        # Re-indenting the reply is only safe when every line carries the
+        # definition's indent (no column-0 string continuation lines).
+        if scope_indent and not all(
+            line.startswith(scope_indent) for line in scope_lines if line.strip()
+        ):
+            scope = None
+
+    # Only patches that passed the fix test are cached (see
+    # fix_decision_node). The key covers everything that shapes the prompt
+    # and how the patch is judged, not just the error and the source.
+    prompt_kind = "file" if scope is None else "definition"
+    cache_key = hashlib.blake2b(
+        "\0".join((
+            state.error_log,
+            original_code,
+            state.entry_file,
+            state.verification_mode,
+            prompt_kind,
+        )).encode(),
+        digest_size=16,
+    ).hexdigest()
+    cached = _load_cached_patch(cache_key)
+    if cached is not None:
+        state.patch_content, state.patch_model = cached
+        state.patch_cache_key = cache_key
+        log_event(
+            "generate_patch",
+            "Reusing cached LLM patch",
+            {"fix_retry": state.fix_retries}
+        )
+        return state
 
-    from core.llm_client import call_groq_llm, call_nvidia_llm, validate_llm_patch
+    from core.llm_client import (
+        GROQ_MODELS,
+        NVIDIA_MODEL,
+        call_groq_llm,
+        call_nvidia_llm,
+        parse_llm_patch,
+    )
 
-    def extract_top_level_symbols(source: str) -> set[tuple[str, str]]:
-        try:
-            tree = ast.parse(source)
-        except SyntaxError:
-            return set()
-
-        symbols = set()
-        for node in tree.body:
-            if isinstance(node, ast.FunctionDef):
-                symbols.add(("function", node.name))
-            elif isinstance(node, ast.AsyncFunctionDef):
-                symbols.add(("async_function", node.name))
-            elif isinstance(node, ast.ClassDef):
-                symbols.add(("class", node.name))
-        return symbols
-
-    def extract_import_roots(source: str) -> set[str]:
-        try:
-            tree = ast.parse(source)
-        except SyntaxError:
-            return set()
-
-        roots = set()
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    roots.add(alias.name.split(".")[0])
-            elif isinstance(node, ast.ImportFrom):
-                if node.level == 0 and node.module:
-                    roots.add(node.module.split(".")[0])
-        return roots
-
-    stdlib_modules = set(getattr(sys, "stdlib_module_names", set()))
-    stdlib_modules.update(sys.builtin_module_names)
-
-    def has_new_third_party_imports(original: str, candidate: str) -> tuple[bool, list[str]]:
-        original_imports = extract_import_roots(original)
-        candidate_imports = extract_import_roots(candidate)
-        new_imports = candidate_imports - original_imports
-        third_party_imports = sorted(
-            module for module in new_imports if module and module not in stdlib_modules
+    # The traceback tail names the failing frame; older output is noise.
+    error_tail = state.error_log[-_MAX_ERROR_LOG_CHARS:]
+
+    # Messages are laid out stable-first: the constant system prompt, then
+    # the source, then the error, which changes on every fix retry. The
+    # reprompts below only ever append, so provider-side prefix (KV) caches
+    # keep matching everything before the first differing token.
+    if scope is None:
+        prompt_code = original_code
+        reprompt_rules = _REPROMPT_RULES
+        messages = [
+            {"role": "system", "content": _SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"File:\n{original_code}\n\nError:\n{error_tail}",
+            },
+        ]
+    else:
+        prompt_code = "\n".join(line[len(scope_indent):] for line in scope_lines)
+        reprompt_rules = _SCOPE_REPROMPT_RULES
+        outline = scope_outline(original_tree, original_lines, scope_start, scope_end)
+        messages = [
+            {"role": "system", "content": _SCOPE_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": (
+                    f"File outline:\n{outline}\n\n"
+                    f"Definition (lines {scope_start + 1}-{scope_end}):\n{prompt_code}\n\n"
+                    f"Error:\n{error_tail}"
+                ),
+            },
+        ]
+        scope_head = "".join(line + "\n" for line in original_lines[:scope_start])
+        scope_tail = "".join("\n" + line for line in original_lines[scope_end:])
+        if original_code.endswith("\n"):
+            scope_tail += "\n"
+        log_event(
+            "generate_patch",
+            "Prompt localized to failing definition",
+            {"start_line": scope_start + 1, "end_line": scope_end},
         )
-        return bool(third_party_imports), third_party_imports
 
-    def looks_incomplete_patch(original: str, candidate: str) -> bool:
-        if not candidate.strip():
+    prompt_line_count = prompt_code.count("\n") + 1
+
+    # A full fix is roughly the size of what was sent; a stream that runs
+    # far past it is rambling and is cut off for the validator to reject.
+    stream_limit = 2 * len(prompt_code) + 4096
+
+    def splice_scope(definition: str) -> str:
+        if scope_indent:
+            definition = textwrap.indent(definition, scope_indent)
+        return scope_head + definition + scope_tail
+
+    def looks_incomplete_patch(candidate: str) -> bool:
+        if not candidate or candidate.isspace():
             return True
 
-        original_len = len(original)
+        # A verbatim copy lost nothing; skip the AST and diff work.
+        if candidate == original_code:
+            return False
+
+        original_len = len(original_code)
         candidate_len = len(candidate)
-        original_lines = len(original.splitlines())
-        candidate_lines = len(candidate.splitlines())
+        candidate_lines = candidate.splitlines()
 
         # For large files, full-file strategy should preserve most of the file.
         if original_len >= 2000 and candidate_len < int(original_len * 0.9):
             return True
-        if original_lines >= 120 and candidate_lines < int(original_lines * 0.9):
+        if len(original_lines) >= 120 and len(candidate_lines) < int(len(original_lines) * 0.9):
             return True
 
-        original_symbols = extract_top_level_symbols(original)
         candidate_symbols = extract_top_level_symbols(candidate)
         if original_symbols:
             preserved = len(original_symbols & candidate_symbols) / len(original_symbols)
@@ -244,107 +673,195 @@ Fix the bug and return the full corrected file.
                 return True
 
         # Big one-way deletions are typically truncation in this workflow.
-        matcher = difflib.SequenceMatcher(
-            None,
-            original.splitlines(),
-            candidate.splitlines(),
-        )
-        removed_lines = 0
-        added_lines = 0
-        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
-            if tag in ("replace", "delete"):
-                removed_lines += (i2 - i1)
-            if tag in ("replace", "insert"):
-                added_lines += (j2 - j1)
+        # removed >= 80 with added < removed / 3 implies a net loss of more
+        # than 53 lines, so anything smaller cannot trip the rule below.
+        if len(original_lines) - len(candidate_lines) <= 53:
+            return False
+
+        removed_lines, added_lines = count_line_changes(original_lines, candidate_lines)
         if removed_lines >= 80 and removed_lines > added_lines * 3:
             return True
 
         return False
 
-    def try_provider(provider_name: str, provider_fn):
-        llm_output = ""
-        rejection_reason = "unknown"
-
-        for attempt in range(3):
-            attempt_messages = messages
-            if attempt > 0:
-                previous_output = llm_output
-                if len(previous_output) > 10000:
-                    previous_output = previous_output[:10000]
-
-                original_line_count = len(original_code.splitlines())
-                previous_line_count = len(llm_output.splitlines()) if llm_output else 0
-                attempt_messages = messages + [
-                    {"role": "assistant", "content": previous_output},
-                    {
-                        "role": "user",
-                        "content": (
-                            "Your previous response was rejected. "
-                            f"Reason: {rejection_reason}. "
-                            f"Original file lines: {original_line_count}. "
-                            f"Previous response lines: {previous_line_count}. "
-                            "Return ONLY raw Python code for the full corrected file. "
-                            "Do not drop unrelated functions/classes from the original file. "
-                            "Preserve all existing functions/classes unless required for the fix. "
-                            "Do not include explanations or markdown."
-                        ),
-                    },
-                ]
-
-            try:
-                llm_output = provider_fn(attempt_messages)
-            except Exception as error:
-                log_event(
-                    "generate_patch",
-                    "LLM provider call failed",
-                    {
-                        "provider": provider_name,
-                        "attempt": attempt + 1,
-                        "error": str(error),
-                    }
-                )
-                return None
-
-            llm_output = llm_output.replace("```python", "").replace("```", "").strip()
-
-            is_valid_patch = validate_llm_patch(llm_output)
-            is_incomplete = looks_incomplete_patch(original_code, llm_output)
-            has_unwanted_imports, third_party_imports = has_new_third_party_imports(
-                original_code,
-                llm_output,
-            )
-
-            if is_valid_patch and not is_incomplete and not has_unwanted_imports:
-                return llm_output
-
-            if not is_valid_patch:
-                rejection_reason = "invalid_python_or_format"
-            elif is_incomplete:
-                rejection_reason = "possible_truncation_or_major_content_loss"
-            else:
-                rejection_reason = "new_third_party_imports"
+    def reprompt_messages(previous_output: str, rejection_reason: str) -> list:
+        # Outputs are stripped, so counting newlines gives the line count
+        # without materializing a second list of lines.
+        previous_line_count = previous_output.count("\n") + 1 if previous_output else 0
+        if len(previous_output) > 10000:
+            previous_output = previous_output[:10000]
+
+        # `messages` is reused unchanged as the prefix, so the file is not
+        # re-rendered and provider-side prefix caches still match.
+        return [
+            *messages,
+            {"role": "assistant", "content": previous_output},
+            {
+                "role": "user",
+                "content": (
+                    "Your previous response was rejected. "
+                    f"Reason: {rejection_reason}. "
+                    f"Original {prompt_kind} lines: {prompt_line_count}. "
+                    f"Previous response lines: {previous_line_count}. "
+                    f"{reprompt_rules}"
+                ),
+            },
+        ]
+
+    def call_provider(provider_name: str, provider_fn, model: str, attempt: int, attempt_messages, cancel):
+        try:
+            return provider_fn(attempt_messages, max_chars=stream_limit, model=model, cancel=cancel)
+        except Exception as error:
             log_event(
                 "generate_patch",
-                "LLM output rejected by validator",
+                "LLM provider call failed",
                 {
                     "provider": provider_name,
+                    "model": model,
                     "attempt": attempt + 1,
-                    "reason": rejection_reason,
-                    "possible_truncation": is_incomplete,
-                    "third_party_imports": third_party_imports,
+                    "error": str(error),
                 }
             )
+            return None
+
+    def check_output(provider_name: str, attempt: int, llm_output: str):
+        """
+        Returns (output, rejection_reason). An accepted output (reason None)
+        is the full patched file; a rejected one is the cleaned reply, as
+        sent back in the reprompt.
+        """
+        if "```" in llm_output:
+            llm_output = _FENCE_RE.sub("", llm_output)
+        if scope is None:
+            llm_output = candidate = llm_output.strip()
+        else:
+            # Dedented rather than stripped, so the body keeps its indent.
+            llm_output = textwrap.dedent(llm_output).lstrip("\n").rstrip()
+            candidate = splice_scope(llm_output)
+
+        # A truncated response almost always leaves brackets or a
+        # docstring open; catch that with str.count before any ast.parse.
+        if bracket_balance(candidate) != original_balance:
+            rejection_reason = "unbalanced_or_truncated"
+            is_incomplete = True
+            third_party_imports = []
+        else:
+            # Parsed once; the same tree feeds the import check.
+            candidate_tree = parse_llm_patch(candidate)
+            is_incomplete = looks_incomplete_patch(candidate)
+            third_party_imports = []
+            if candidate_tree is not None:
+                _, third_party_imports = has_new_third_party_imports(candidate_tree)
+
+            if candidate_tree is None:
+                rejection_reason = "invalid_python_or_format"
+            elif is_incomplete:
+                rejection_reason = "possible_truncation_or_major_content_loss"
+            elif third_party_imports:
+                rejection_reason = "new_third_party_imports"
+            else:
+                return candidate, None
 
-        return None
+        log_event(
+            "generate_patch",
+            "LLM output rejected by validator",
+            {
+                "provider": provider_name,
+                "attempt": attempt + 1,
+                "reason": rejection_reason,
+                "possible_truncation": is_incomplete,
+                "third_party_imports": third_party_imports,
+            }
+        )
+        return llm_output, rejection_reason
+
+    providers = (("nvidia", call_nvidia_llm), ("groq", call_groq_llm))
+
+    # Groq tries its small, fast model on a first fix attempt; reprompts
+    # and retries after a failed fix escalate to the 70B model.
+    groq_tier = "instant" if state.fix_retries == 0 else "versatile"
+    first_models = {"nvidia": NVIDIA_MODEL, "groq": GROQ_MODELS[groq_tier]}
+    reprompt_models = {"nvidia": NVIDIA_MODEL, "groq": GROQ_MODELS["versatile"]}
+
+    # provider name -> (last output, rejection reason); a provider whose
+    # call raised drops out and is not reprompted.
+    rejected = {}
+
+    head_start = _HEAD_START_SECONDS if os.getenv("OPSGUARD_PROVIDER_RACE") != "0" else None
+
+    def race(attempt: int, requests: list):
+        """
+        Sends each (provider_name, provider_fn, model, messages) request
+        concurrently and returns (model, output) for the first output that
+        passes validation, or None. The first request gets a short head start so the
+        preferred provider can win without spending the other's quota.
+        Slower calls are abandoned once an output is accepted.
+        """
+        futures = {}
+        # Set once the race is decided; a losing call still streaming sees it
+        # on its next chunk and closes its stream so it stops spending tokens.
+        cancel = threading.Event()
+
+        def settle(future):
+            provider_name, model = futures.pop(future)
+            rejected.pop(provider_name, None)
+            raw_output = future.result()
+            if raw_output is None:
+                return None
 
-    llm_output = try_provider("nvidia", call_nvidia_llm)
+            cleaned_output, rejection_reason = check_output(provider_name, attempt, raw_output)
+            if rejection_reason is None:
+                return model, cleaned_output
+            rejected[provider_name] = (cleaned_output, rejection_reason)
+            return None
 
-    if llm_output is None:
-        llm_output = try_provider("groq", call_groq_llm)
+        try:
+            for index, (provider_name, provider_fn, model, attempt_messages) in enumerate(requests):
+                future = _submit_daemon(
+                    call_provider, provider_name, provider_fn, model, attempt,
+                    attempt_messages, cancel,
+                )
+                futures[future] = (provider_name, model)
+
+                if index == 0 and len(requests) > 1:
+                    done, _ = wait([future], timeout=head_start)
+                    if done:
+                        accepted = settle(future)
+                        if accepted is not None:
+                            return accepted
+
+            for future in as_completed(list(futures)):
+                accepted = settle(future)
+                if accepted is not None:
+                    return accepted
+            return None
+        finally:
+            cancel.set()
+
+    accepted = race(
+        0,
+        [(name, provider_fn, first_models[name], messages) for name, provider_fn in providers],
+    )
+
+    # Every rejected provider is reprompted with its own last output, all
+    # of them concurrently, for up to three attempts in total.
+    for attempt in range(1, 3):
+        if accepted is not None or not rejected:
+            break
+        accepted = race(
+            attempt,
+            [
+                (name, provider_fn, reprompt_models[name], reprompt_messages(*rejected[name]))
+                for name, provider_fn in providers
+                if name in rejected
+            ],
+        )
 
-    if llm_output is None:
+    if accepted is None:
         state.fix_retries += 1
         state.patch_content = ""
+        state.patch_model = None
+        state.patch_cache_key = None
         log_event(
             "generate_patch",
             "LLM failed validation after reprompt",
@@ -352,6 +869,13 @@ Fix the bug and return the full corrected file.
         )
         return state
 
+    state.patch_model, llm_output = accepted
+
+    # A verbatim copy fixes nothing; caching it would just replay the miss.
+    # Otherwise the key is kept so fix_decision_node can cache the patch
+    # once it has passed the fix test.
+    state.patch_cache_key = cache_key if llm_output != original_code else None
+
     state.patch_content = llm_output
 
     return state
@@ -360,6 +884,8 @@ Fix the bug and return the full corrected file.
 
 
 def apply_patch_node(state: OpsGuardState) -> OpsGuardState:
+    global _LAST_PATCH_HASH
+
     if not state.patch_content:
         state.patch_diff = ""
         state.human_readable_changes = []
@@ -377,14 +903,27 @@ def apply_patch_node(state: OpsGuardState) -> OpsGuardState:
     state.patch_diff = patch_result["diff"]
     state.human_readable_changes = patch_result.get("changed_blocks", [])
 
-    artifacts_dir = os.path.join(os.getcwd(), "artifacts")
-    internal_dir = os.path.join(artifacts_dir, "internal")
-    os.makedirs(internal_dir, exist_ok=True)
+    _, internal_dir, _ = _artifact_dirs()
 
     patch_file = os.path.join(internal_dir, "latest_patch.py")
-
-    with open(patch_file, "w", encoding="utf-8") as f:
-        f.write(state.patch_content or "")
+    patch_hash = hashlib.blake2b(
+        state.patch_content.encode("utf-8"), digest_size=16
+    ).digest()
+
+    # Repeated attempts often re-apply the same patch; skip the rewrite
+    # when the artifact on disk already holds it.
+    if patch_hash != _LAST_PATCH_HASH or not os.path.exists(patch_file):
+        # Always an independent file: the workspace copy is mounted writable
+        # into the sandbox, so a link to it would let the code under test
+        # rewrite this artifact. Unlinked first so an existing link is
+        # replaced rather than written through.
+        try:
+            os.unlink(patch_file)
+        except FileNotFoundError:
+            pass
+        with open(patch_file, "w", encoding="utf-8") as f:
+            f.write(state.patch_content)
+        _LAST_PATCH_HASH = patch_hash
 
     log_event(
         "apply_patch",
@@ -401,15 +940,17 @@ def syntax_check_node(state: OpsGuardState) -> OpsGuardState:
     if not state.patch_content:
         return state
 
-    process = subprocess.run(
-        ["python", "-m", "py_compile", state.entry_file],
-        cwd=state.workspace_path,
-        capture_output=True,
-        text=True
-    )
-
-    if process.returncode != 0:
+    # patch_content is exactly what apply_patch wrote, so compile it
+    # in-process instead of forking `python -m py_compile`.
+    try:
+        compile(state.patch_content, state.entry_file, "exec")
+    except (SyntaxError, ValueError) as error:
         state.fix_retries += 1
+        log_event(
+            "syntax_check",
+            "Patched file failed to compile",
+            {"error": str(error)}
+        )
 
     return state
 
@@ -465,6 +1006,10 @@ def fix_decision_node(state: OpsGuardState) -> OpsGuardState:
     if state.fix_result["exit_code"] == 0:
         state.fix_verified = True
         state.status = Status.SUCCESS
+        # Persisted only now that the patch has passed the fix test, so a
+        # later run never replays an unverified patch.
+        if state.patch_cache_key:
+            _store_patch(state.patch_cache_key, state.patch_content, state.patch_model)
 
         log_event(
             "fix_decision",
@@ -473,6 +1018,10 @@ def fix_decision_node(state: OpsGuardState) -> OpsGuardState:
         )
     else:
         state.fix_retries += 1
+        # A cached patch can go stale (e.g. the sandbox image changed); drop
+        # it so the retry asks the LLM instead of replaying it.
+        if state.patch_cache_key:
+            _forget_patch(state.patch_cache_key)
 
         log_event(
             "fix_decision",
@@ -520,19 +1069,16 @@ def generate_not_reproducible_node(state: OpsGuardState) -> OpsGuardState:
 
 
 def generate_final_report_node(state: OpsGuardState) -> OpsGuardState:
-    artifacts_dir = os.path.join(os.getcwd(), "artifacts")
-    internal_dir = os.path.join(artifacts_dir, "internal")
-    presentation_dir = os.path.join(artifacts_dir, "presentation")
-    os.makedirs(internal_dir, exist_ok=True)
-    os.makedirs(presentation_dir, exist_ok=True)
+    artifacts_dir, internal_dir, presentation_dir = _artifact_dirs()
 
     report = {
         "status": state.status.value,
         "error_type": state.error_type.value if state.error_type else None,
         "reproduce_retries": state.reproduce_retries,
         "fix_retries": state.fix_retries,
+        "patch_model": state.patch_model,
         "workspace_path": state.workspace_path,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(_UTC).isoformat(),
         "patch_diff_summary": None,
         "patch_diff_file": None,
         "judge_summary_file": None,
@@ -541,9 +1087,12 @@ def generate_final_report_node(state: OpsGuardState) -> OpsGuardState:
     }
 
     if state.patch_diff:
-        lines = state.patch_diff.splitlines()
-        added = sum(1 for line in lines if line.startswith("+") and not line.startswith("+++"))
-        removed = sum(1 for line in lines if line.startswith("-") and not line.startswith("---"))
+        # Counted in C by str.count; the leading newline lets the first
+        # line match too. A bare "+" (added blank line) still counts, and
+        # only "+++"/"---" headers are subtracted.
+        body = "\n" + state.patch_diff
+        added = body.count("\n+") - body.count("\n+++")
+        removed = body.count("\n-") - body.count("\n---")
         report["patch_diff_summary"] = {
             "lines_added": added,
             "lines_removed": removed,
@@ -551,55 +1100,54 @@ def generate_final_report_node(state: OpsGuardState) -> OpsGuardState:
 
     state.report = report
 
+    # All three artifacts are rendered in memory and written together.
+    outputs = {}
+
     if state.patch_diff:
         patch_diff_path = os.path.join(internal_dir, "patch.diff")
-        with open(patch_diff_path, "w", encoding="utf-8") as f:
-            f.write(state.patch_diff)
+        outputs[patch_diff_path] = state.patch_diff
         report["patch_diff_file"] = patch_diff_path
 
     summary_path = os.path.join(presentation_dir, "judge_summary.txt")
 
-    with open(summary_path, "w", encoding="utf-8") as f:
-        f.write("====================================================\n")
-        f.write("                OPSGUARD REMEDIATION REPORT\n")
-        f.write("====================================================\n\n")
-
-        f.write(f"STATUS        : {state.status.value}\n")
-        f.write(f"ERROR TYPE    : {state.error_type.value if state.error_type else 'Unknown'}\n")
-
-        if report.get("patch_diff_summary"):
-            added = report["patch_diff_summary"]["lines_added"]
-            removed = report["patch_diff_summary"]["lines_removed"]
-            f.write(f"IMPACT        : +{added} lines, -{removed} line{'s' if removed != 1 else ''}\n")
+    rule = "====================================================\n"
+    divider = "----------------------------------------------------\n"
+    parts = [
+        rule,
+        "                OPSGUARD REMEDIATION REPORT\n",
+        rule,
+        "\n",
+        f"STATUS        : {state.status.value}\n",
+        f"ERROR TYPE    : {state.error_type.value if state.error_type else 'Unknown'}\n",
+    ]
 
-        f.write("\n")
-        f.write("----------------------------------------------------\n")
-        f.write(f"CHANGED FILE  : {state.entry_file}\n")
-        f.write("----------------------------------------------------\n\n")
+    if report.get("patch_diff_summary"):
+        added = report["patch_diff_summary"]["lines_added"]
+        removed = report["patch_diff_summary"]["lines_removed"]
+        parts.append(f"IMPACT        : +{added} lines, -{removed} line{'s' if removed != 1 else ''}\n")
 
-        for change in state.human_readable_changes or []:
-            f.write(f"Change at Line {change['line_number']}\n")
-            f.write("----------------------------------------------------\n\n")
+    parts += ["\n", divider, f"CHANGED FILE  : {state.entry_file}\n", divider, "\n"]
 
-            f.write("BEFORE\n")
-            for line in change["before"].splitlines():
-                f.write(f"    {line}\n")
+    for change in state.human_readable_changes or []:
+        parts += [f"Change at Line {change['line_number']}\n", divider, "\n", "BEFORE\n"]
+        # Blocks are "\n"-joined lines, so indenting is one replace().
+        if change["before"]:
+            parts.append("    " + change["before"].replace("\n", "\n    ") + "\n")
 
-            f.write("\nAFTER\n")
-            for line in change["after"].splitlines():
-                f.write(f"    {line}\n")
+        parts.append("\nAFTER\n")
+        if change["after"]:
+            parts.append("    " + change["after"].replace("\n", "\n    ") + "\n")
 
-            f.write("\n")
+        parts.append("\n")
 
-        f.write("====================================================\n")
-        f.write("Generated by OpsGuard\n")
-        f.write("====================================================\n")
+    parts += [rule, "Generated by OpsGuard\n", rule]
+    outputs[summary_path] = "".join(parts)
 
     report["judge_summary_file"] = summary_path
     report_path = os.path.join(artifacts_dir, "final_report.json")
+    outputs[report_path] = _dump_report(report)
 
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(report, f, indent=2)
+    _write_files(outputs)
 
     log_event(
         "generate_final_report",
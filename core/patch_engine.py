@@ -1,5 +1,111 @@
 import os
-import difflib
+
+from core.file_cache import read_cached, write_cached
+
+
+def trim_common_lines(original_lines: list, new_lines: list) -> tuple[int, int, int]:
+    """
+    Returns (start, original_end, new_end): lines before `start` and from
+    the two end indices on are identical in both versions.
+    """
+    start = 0
+    original_end = len(original_lines)
+    new_end = len(new_lines)
+
+    while (
+        start < original_end
+        and start < new_end
+        and original_lines[start] == new_lines[start]
+    ):
+        start += 1
+
+    while (
+        original_end > start
+        and new_end > start
+        and original_lines[original_end - 1] == new_lines[new_end - 1]
+    ):
+        original_end -= 1
+        new_end -= 1
+
+    return start, original_end, new_end
+
+
+def _diff_opcodes(original_lines: list, new_lines: list) -> list:
+    """
+    SequenceMatcher opcodes for the full files, computed on the changed
+    middle only. A one-function fix in a large file leaves most lines in
+    the common prefix/suffix, which SequenceMatcher would otherwise scan.
+    """
+    import difflib
+
+    start, original_end, new_end = trim_common_lines(original_lines, new_lines)
+
+    opcodes = []
+    if start:
+        opcodes.append(("equal", 0, start, 0, start))
+
+    # autojunk would treat lines repeated across a 200+ line middle (blank
+    # lines, `return`, closing brackets) as junk and misalign the hunks.
+    matcher = difflib.SequenceMatcher(
+        None,
+        original_lines[start:original_end],
+        new_lines[start:new_end],
+        autojunk=False,
+    )
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        opcodes.append((tag, i1 + start, i2 + start, j1 + start, j2 + start))
+
+    if original_end < len(original_lines):
+        opcodes.append(
+            ("equal", original_end, len(original_lines), new_end, len(new_lines))
+        )
+
+    return opcodes
+
+
+def _format_range(start: int, stop: int) -> str:
+    # Same hunk range format as difflib.unified_diff.
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def _unified_diff(original_lines, new_lines, opcodes, fromfile, tofile, n=3) -> list:
+    """
+    difflib.unified_diff(..., lineterm="") output built from precomputed
+    opcodes.
+    """
+    import difflib
+
+    grouper = difflib.SequenceMatcher(None)
+    grouper.opcodes = opcodes
+
+    diff = []
+    for group in grouper.get_grouped_opcodes(n):
+        if not diff:
+            diff.append(f"--- {fromfile}")
+            diff.append(f"+++ {tofile}")
+
+        first, last = group[0], group[-1]
+        diff.append(
+            f"@@ -{_format_range(first[1], last[2])} "
+            f"+{_format_range(first[3], last[4])} @@"
+        )
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                diff.extend(" " + line for line in original_lines[i1:i2])
+                continue
+            if tag in ("replace", "delete"):
+                diff.extend("-" + line for line in original_lines[i1:i2])
+            if tag in ("replace", "insert"):
+                diff.extend("+" + line for line in new_lines[j1:j2])
+
+    return diff
 
 
 def apply_full_file_patch(workspace_path: str, filename: str, new_content: str) -> dict:
@@ -12,27 +118,34 @@ def apply_full_file_patch(workspace_path: str, filename: str, new_content: str)
             "changed_blocks": [],
         }
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        original_content = f.read()
+    # Usually served from memory: generate_patch_node just read this file.
+    original_content = read_cached(file_path)
+
+    # A verbatim patch changes nothing: no diff to build, no write.
+    if new_content == original_content:
+        return {
+            "success": True,
+            "diff": "",
+            "changed_blocks": [],
+        }
 
     original_lines = original_content.splitlines()
     new_lines = new_content.splitlines()
 
-    diff = list(
-        difflib.unified_diff(
-            original_lines,
-            new_lines,
-            fromfile=f"a/{filename}",
-            tofile=f"b/{filename}",
-            lineterm="",
-        )
+    opcodes = _diff_opcodes(original_lines, new_lines)
+
+    diff = _unified_diff(
+        original_lines,
+        new_lines,
+        opcodes,
+        fromfile=f"a/{filename}",
+        tofile=f"b/{filename}",
     )
     diff_text = "\n".join(diff)
 
     changed_blocks = []
-    matcher = difflib.SequenceMatcher(None, original_lines, new_lines)
 
-    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+    for tag, i1, i2, j1, j2 in opcodes:
         if tag in ("replace", "delete", "insert"):
             before_block = "\n".join(original_lines[i1:i2]).strip()
             after_block = "\n".join(new_lines[j1:j2]).strip()
@@ -45,8 +158,7 @@ def apply_full_file_patch(workspace_path: str, filename: str, new_content: str)
                 }
             )
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(new_content)
+    write_cached(file_path, new_content)
 
     return {
         "success": True,
@@ -38,6 +38,8 @@ class OpsGuardState(BaseModel):
 
     # ---- Fix Phase ----
     patch_content: Optional[str] = None
+    patch_model: Optional[str] = None
+    patch_cache_key: Optional[str] = None
     patch_diff: Optional[str] = None
     human_readable_changes: Optional[list] = None
     fix_result: Optional[Dict] = None
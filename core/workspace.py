@@ -1,6 +1,9 @@
 import shutil
 import tempfile
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from core.docker_executor import close_session
 
 
 def create_workspace(repo_path: str) -> str:
@@ -25,10 +28,84 @@ def create_workspace(repo_path: str) -> str:
     return workspace_path
 
 
+_CLEANUP_WORKERS = 8
+
+# dir_fd-relative unlink/rmdir need POSIX *at() syscalls.
+_FD_CLEANUP_SUPPORTED = (
+    os.unlink in os.supports_dir_fd
+    and os.rmdir in os.supports_dir_fd
+    and os.open in os.supports_dir_fd
+    and os.scandir in os.supports_fd
+)
+
+
+def _purge_dir(dir_fd: int):
+    """
+    Removes everything inside an open directory, resolving names relative
+    to its fd so no per-entry path lookup is needed.
+    """
+    with os.scandir(dir_fd) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _remove_subdir(dir_fd, entry.name)
+            else:
+                os.unlink(entry.name, dir_fd=dir_fd)
+
+
+def _remove_subdir(parent_fd: int, name: str):
+    sub_fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW, dir_fd=parent_fd)
+    try:
+        _purge_dir(sub_fd)
+    finally:
+        os.close(sub_fd)
+    os.rmdir(name, dir_fd=parent_fd)
+
+
+def _fast_rmtree(path: str):
+    """
+    Deletes a directory tree with scandir + unlinkat, spreading top-level
+    subdirectories over a thread pool.
+    """
+    root_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        subdirs = []
+        with os.scandir(root_fd) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.name)
+                else:
+                    os.unlink(entry.name, dir_fd=root_fd)
+
+        if len(subdirs) > 1:
+            with ThreadPoolExecutor(max_workers=_CLEANUP_WORKERS) as pool:
+                # list() re-raises the first failure from any worker.
+                list(pool.map(lambda name: _remove_subdir(root_fd, name), subdirs))
+        else:
+            for name in subdirs:
+                _remove_subdir(root_fd, name)
+    finally:
+        os.close(root_fd)
+
+    os.rmdir(path)
+
+
 def cleanup_workspace(workspace_path: str):
     """
-    Deletes the workspace directory.
+    Stops the workspace's sandbox container and deletes the directory.
     """
 
-    if os.path.exists(workspace_path):
-        shutil.rmtree(workspace_path)
+    close_session(workspace_path)
+
+    if not os.path.exists(workspace_path):
+        return
+
+    if _FD_CLEANUP_SUPPORTED:
+        try:
+            _fast_rmtree(workspace_path)
+            return
+        except (OSError, RecursionError):
+            # Fall back to the stdlib for anything unusual (permissions,
+            # very deep trees); it also finishes a partially purged tree.
+            pass
+
+    shutil.rmtree(workspace_path)
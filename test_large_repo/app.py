@@ -4,10 +4,14 @@ Handles data ingestion, validation, transformation, statistical analysis,
 anomaly detection, and report generation for multi-warehouse inventory.
 """
 
+import copy
 import csv
 import statistics
 import json
 import hashlib
+import heapq
+import math
+import operator
 import re
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
@@ -106,6 +110,13 @@ class PatternValidator(Validator):
 class DataRecord:
     """Represents a single inventory data record with full validation."""
 
+    # Fixed attribute set: no per-record __dict__, and faster field access.
+    __slots__ = (
+        "record_id", "name", "category", "price", "quantity",
+        "timestamp", "warehouse", "sku", "supplier", "checksum",
+        "total_value",
+    )
+
     VALID_CATEGORIES = [
         "electronics", "clothing", "food", "furniture", "books",
         "automotive", "health", "toys", "sports", "garden"
@@ -117,6 +128,23 @@ class DataRecord:
     quantity_validator = RangeValidator(min_val=0, max_val=100000)
     sku_validator = PatternValidator(r'^[A-Z]{2,4}-\d{4,8}$', "SKU format XX-0000")
 
+    WHITESPACE_RE = re.compile(r'\s+')
+
+    TIMESTAMP_FORMATS = (
+        "%Y-%m-%d %H:%M:%S",
+        "%Y-%m-%dT%H:%M:%S",
+        "%Y-%m-%d",
+        "%m/%d/%Y",
+        "%d-%m-%Y",
+        "%Y/%m/%d %H:%M",
+    )
+
+    # Zero-padded forms of the first three formats; datetime.fromisoformat
+    # parses these in C to the same value strptime would.
+    ISO_TIMESTAMP_RE = re.compile(
+        r'[0-9]{4}-[0-9]{2}-[0-9]{2}(?:[ T][0-9]{2}:[0-9]{2}:[0-9]{2})?'
+    )
+
     def __init__(self, record_id, name, category, price, quantity,
                  timestamp_str, warehouse, sku, supplier):
         self.record_id = record_id
@@ -129,10 +157,12 @@ class DataRecord:
         self.sku = self._validate_sku(sku)
         self.supplier = supplier
         self.checksum = self._compute_checksum()
+        # Read by nearly every aggregation; computed once per record.
+        self.total_value = round(self.price * self.quantity, 2)
 
     def _sanitize_name(self, name):
         cleaned = str(name).strip()
-        cleaned = re.sub(r'\s+', ' ', cleaned)
+        cleaned = self.WHITESPACE_RE.sub(' ', cleaned)
         if len(cleaned) < 2:
             raise ValueError(f"Record {self.record_id}: Name too short: '{cleaned}'")
         if len(cleaned) > 200:
@@ -160,17 +190,15 @@ class DataRecord:
         return value
 
     def _parse_timestamp(self, timestamp_str):
-        formats = [
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d",
-            "%m/%d/%Y",
-            "%d-%m-%Y",
-            "%Y/%m/%d %H:%M",
-        ]
-        for fmt in formats:
+        text = str(timestamp_str).strip()
+        if self.ISO_TIMESTAMP_RE.fullmatch(text):
             try:
-                return datetime.strptime(str(timestamp_str).strip(), fmt)
+                return datetime.fromisoformat(text)
+            except ValueError:
+                pass
+        for fmt in self.TIMESTAMP_FORMATS:
+            try:
+                return datetime.strptime(text, fmt)
             except ValueError:
                 continue
         raise ValueError(
@@ -191,11 +219,8 @@ class DataRecord:
 
     def _compute_checksum(self):
         raw = f"{self.record_id}:{self.sku}:{self.price}:{self.quantity}"
-        return hashlib.md5(raw.encode()).hexdigest()[:8]
-
-    @property
-    def total_value(self):
-        return round(self.price * self.quantity, 2)
+        # 4-byte digest = 8 hex chars, without hashing 16 bytes and slicing.
+        return hashlib.blake2b(raw.encode(), digest_size=4).hexdigest()
 
     @property
     def is_high_value(self):
@@ -233,24 +258,40 @@ class DataRecord:
 class StatisticsEngine:
     """Performs statistical calculations on numeric datasets."""
 
+    @staticmethod
+    def _stdev(values, mean):
+        # Sample standard deviation in float arithmetic; statistics.stdev
+        # works in exact fractions, which is far slower on large inputs.
+        # math.hypot sums the squared deviations in one C pass, with
+        # extended-precision accumulation.
+        return math.hypot(*[v - mean for v in values]) / math.sqrt(len(values) - 1)
+
     @staticmethod
     def compute_stats(values):
         if not values:
             return {"count": 0, "mean": 0, "median": 0, "stdev": 0,
                     "min": 0, "max": 0, "q1": 0, "q3": 0, "iqr": 0}
 
+        # One sort serves the median, quartiles and extremes.
         sorted_vals = sorted(values)
         n = len(sorted_vals)
         q1_idx = n // 4
         q3_idx = (3 * n) // 4
+        mid = n // 2
+        if n % 2:
+            median = sorted_vals[mid]
+        else:
+            median = (sorted_vals[mid - 1] + sorted_vals[mid]) / 2
+        mean = statistics.fmean(sorted_vals)
 
         return {
             "count": n,
-            "mean": round(statistics.mean(values), 2),
-            "median": round(statistics.median(values), 2),
-            "stdev": round(statistics.stdev(values), 2) if n > 1 else 0.0,
-            "min": round(min(values), 2),
-            "max": round(max(values), 2),
+            "mean": round(mean, 2),
+            "median": round(median, 2),
+            "stdev": round(StatisticsEngine._stdev(sorted_vals, mean), 2)
+                if n > 1 else 0.0,
+            "min": round(sorted_vals[0], 2),
+            "max": round(sorted_vals[-1], 2),
             "q1": round(sorted_vals[q1_idx], 2),
             "q3": round(sorted_vals[q3_idx], 2),
             "iqr": round(sorted_vals[q3_idx] - sorted_vals[q1_idx], 2),
@@ -261,20 +302,17 @@ class StatisticsEngine:
         if len(x_values) != len(y_values) or len(x_values) < 2:
             return 0.0
 
-        n = len(x_values)
-        mean_x = statistics.mean(x_values)
-        mean_y = statistics.mean(y_values)
-
-        numerator = sum(
-            (x - mean_x) * (y - mean_y) for x, y in zip(x_values, y_values)
-        )
-        denom_x = sum((x - mean_x) ** 2 for x in x_values) ** 0.5
-        denom_y = sum((y - mean_y) ** 2 for y in y_values) ** 0.5
-
-        if denom_x == 0 or denom_y == 0:
+        # Pearson r from centered columns: the cross product is summed by
+        # fsum over map() and each norm by math.hypot, all in C.
+        mean_x = statistics.fmean(x_values)
+        mean_y = statistics.fmean(y_values)
+        dx = [x - mean_x for x in x_values]
+        dy = [y - mean_y for y in y_values]
+        denom = math.hypot(*dx) * math.hypot(*dy)
+        if denom == 0:
             return 0.0
 
-        return round(numerator / (denom_x * denom_y), 4)
+        return round(math.fsum(map(operator.mul, dx, dy)) / denom, 4)
 
     @staticmethod
     def detect_outliers(values, method="zscore", threshold=2.5):
@@ -282,15 +320,18 @@ class StatisticsEngine:
             return []
 
         if method == "zscore":
-            mean_val = statistics.mean(values)
-            stdev_val = statistics.stdev(values)
+            mean_val = statistics.fmean(values)
+            stdev_val = StatisticsEngine._stdev(values, mean_val)
             if stdev_val == 0:
                 return []
+            # Compare raw deviations against one cutoff; z-scores are only
+            # worked out for the few values that are actually outliers.
+            cutoff = threshold * stdev_val
             return [
                 {"index": i, "value": v,
                  "z_score": round((v - mean_val) / stdev_val, 2)}
                 for i, v in enumerate(values)
-                if abs((v - mean_val) / stdev_val) > threshold
+                if abs(v - mean_val) > cutoff
             ]
         elif method == "iqr":
             sorted_vals = sorted(values)
@@ -300,8 +341,9 @@ class StatisticsEngine:
             iqr = q3 - q1
             lower = q1 - 1.5 * iqr
             upper = q3 + 1.5 * iqr
+            bounds = (round(lower, 2), round(upper, 2))
             return [
-                {"index": i, "value": v, "bounds": (round(lower, 2), round(upper, 2))}
+                {"index": i, "value": v, "bounds": bounds}
                 for i, v in enumerate(values)
                 if v < lower or v > upper
             ]
@@ -321,10 +363,40 @@ class InventoryAnalyzer:
         self.category_index = defaultdict(list)
         self.warehouse_index = defaultdict(list)
         self.supplier_index = defaultdict(list)
+        self.sku_index = defaultdict(list)
+        # Per-group numeric columns, appended once at load so the summaries
+        # don't rebuild [r.price for r in records]-style lists per call.
+        self.category_prices = defaultdict(list)
+        self.category_quantities = defaultdict(list)
+        self.category_values = defaultdict(list)
+        self.warehouse_values = defaultdict(list)
+        self.supplier_values = defaultdict(list)
+        # Per-group distributions, counted as records are loaded.
+        self.category_high_value = Counter()
+        self.warehouse_high_value = Counter()
+        self.category_warehouse_counts = defaultdict(Counter)
+        self.warehouse_category_counts = defaultdict(Counter)
+        self.warehouse_supplier_counts = defaultdict(Counter)
+        self.category_suppliers = defaultdict(set)
+        self.supplier_categories = defaultdict(set)
+        self.supplier_warehouses = defaultdict(set)
+        # Report-wide totals, accumulated in the same load pass.
+        self.valid_count = 0
+        self.total_inventory_value = 0
+        self.high_value_count = 0
+        # supplier -> number of error messages naming it; built lazily.
+        self._supplier_error_counts = {}
+        # Bumped by every load; generate_report reuses its last result
+        # while the version is unchanged.
+        self._version = 0
+        self._cached_report = None
+        self._cached_report_version = None
         self.stats_engine = StatisticsEngine()
 
     @log_execution
     def load_records(self, raw_data):
+        self._version += 1
+        self._supplier_error_counts = {}
         for i, row in enumerate(raw_data):
             try:
                 record = DataRecord(
@@ -342,6 +414,27 @@ class InventoryAnalyzer:
                 self.category_index[record.category].append(record)
                 self.warehouse_index[record.warehouse].append(record)
                 self.supplier_index[record.supplier].append(record)
+                self.sku_index[record.sku].append(record)
+
+                total_value = record.total_value
+                self.category_prices[record.category].append(record.price)
+                self.category_quantities[record.category].append(record.quantity)
+                self.category_values[record.category].append(total_value)
+                self.warehouse_values[record.warehouse].append(total_value)
+                self.supplier_values[record.supplier].append(total_value)
+                self.category_warehouse_counts[record.category][record.warehouse] += 1
+                self.warehouse_category_counts[record.warehouse][record.category] += 1
+                self.warehouse_supplier_counts[record.warehouse][record.supplier] += 1
+                self.category_suppliers[record.category].add(record.supplier)
+                self.supplier_categories[record.supplier].add(record.category)
+                self.supplier_warehouses[record.supplier].add(record.warehouse)
+                if record.is_valid_category():
+                    self.valid_count += 1
+                self.total_inventory_value += total_value
+                if record.is_high_value:
+                    self.high_value_count += 1
+                    self.category_high_value[record.category] += 1
+                    self.warehouse_high_value[record.warehouse] += 1
             except (ValueError, KeyError) as e:
                 self.errors.append({
                     "row_index": i,
@@ -353,9 +446,12 @@ class InventoryAnalyzer:
     @validate_non_empty
     def get_category_summary(self):
         summary = {}
+        # One clock read for the whole summary rather than one per record
+        # through DataRecord.age_days.
+        now = datetime.utcnow()
         for category, records in self.category_index.items():
-            prices = [r.price for r in records]
-            quantities = [r.quantity for r in records]
+            prices = self.category_prices[category]
+            quantities = self.category_quantities[category]
 
             price_stats = self.stats_engine.compute_stats(prices)
             qty_stats = self.stats_engine.compute_stats(quantities)
@@ -364,15 +460,15 @@ class InventoryAnalyzer:
                 "record_count": len(records),
                 "price_stats": price_stats,
                 "quantity_stats": qty_stats,
-                "total_value": round(sum(r.total_value for r in records), 2),
-                "high_value_count": sum(1 for r in records if r.is_high_value),
-                "avg_age_days": round(
-                    statistics.mean([r.age_days for r in records]), 1
+                "total_value": round(sum(self.category_values[category]), 2),
+                "high_value_count": self.category_high_value[category],
+                "avg_age_days": round(statistics.fmean(
+                    [(now - r.timestamp).days for r in records]
+                ), 1),
+                "unique_suppliers": len(self.category_suppliers[category]),
+                "warehouse_distribution": dict(
+                    self.category_warehouse_counts[category]
                 ),
-                "unique_suppliers": len(set(r.supplier for r in records)),
-                "warehouse_distribution": dict(Counter(
-                    r.warehouse for r in records
-                )),
             }
         return summary
 
@@ -380,26 +476,26 @@ class InventoryAnalyzer:
     def get_warehouse_summary(self):
         summary = {}
         for warehouse, records in self.warehouse_index.items():
-            values = [r.total_value for r in records]
+            values = self.warehouse_values[warehouse]
             summary[warehouse] = {
                 "record_count": len(records),
                 "total_value": round(sum(values), 2),
-                "avg_value": round(statistics.mean(values), 2),
-                "category_breakdown": dict(Counter(
-                    r.category for r in records
-                )),
+                "avg_value": round(statistics.fmean(values), 2),
+                "category_breakdown": dict(
+                    self.warehouse_category_counts[warehouse]
+                ),
                 "top_suppliers": self._get_top_items(
-                    [r.supplier for r in records], limit=5
+                    self.warehouse_supplier_counts[warehouse], limit=5
                 ),
-                "high_value_items": sum(1 for r in records if r.is_high_value),
+                "high_value_items": self.warehouse_high_value[warehouse],
             }
         return summary
 
     @validate_non_empty
-    def find_price_outliers(self):
+    def find_price_outliers(self, limit=None):
         all_outliers = []
         for category, records in self.category_index.items():
-            prices = [r.price for r in records]
+            prices = self.category_prices[category]
             outliers = self.stats_engine.detect_outliers(prices, method="zscore")
             for outlier in outliers:
                 record = records[outlier["index"]]
@@ -412,7 +508,7 @@ class InventoryAnalyzer:
                     "z_score": outlier["z_score"],
                     "supplier": record.supplier,
                 })
-        return sorted(all_outliers, key=lambda x: abs(x["z_score"]), reverse=True)
+        return self._top(all_outliers, lambda x: abs(x["z_score"]), limit)
 
     @validate_non_empty
     def get_price_quantity_correlation(self):
@@ -420,10 +516,9 @@ class InventoryAnalyzer:
         for category, records in self.category_index.items():
             if len(records) < 5:
                 continue
-            prices = [r.price for r in records]
-            quantities = [r.quantity for r in records]
             correlations[category] = self.stats_engine.compute_correlation(
-                prices, quantities
+                self.category_prices[category],
+                self.category_quantities[category],
             )
         return correlations
 
@@ -431,46 +526,53 @@ class InventoryAnalyzer:
     def get_time_series_breakdown(self, period="monthly"):
         breakdown = defaultdict(lambda: {
             "count": 0, "total_value": 0.0,
-            "categories": Counter(), "warehouses": Counter()
+            "categories": {}, "warehouses": set()
         })
 
+        # Pick the bucket key builder once, outside the loop; the keys are
+        # formatted from the date fields instead of via strftime per record.
+        if period == "monthly":
+            def period_key(ts):
+                return f"{ts.year}-{ts.month:02d}"
+        elif period == "weekly":
+            def period_key(ts):
+                iso_year, iso_week, _ = ts.isocalendar()
+                return f"{iso_year}-W{iso_week:02d}"
+        elif period == "quarterly":
+            def period_key(ts):
+                return f"{ts.year}-Q{(ts.month - 1) // 3 + 1}"
+        else:
+            def period_key(ts):
+                return f"{ts.year}-{ts.month:02d}-{ts.day:02d}"
+
         for record in self.records:
-            if period == "monthly":
-                key = record.timestamp.strftime("%Y-%m")
-            elif period == "weekly":
-                iso_year, iso_week, _ = record.timestamp.isocalendar()
-                key = f"{iso_year}-W{iso_week:02d}"
-            elif period == "quarterly":
-                quarter = (record.timestamp.month - 1) // 3 + 1
-                key = f"{record.timestamp.year}-Q{quarter}"
-            else:
-                key = record.timestamp.strftime("%Y-%m-%d")
-
-            breakdown[key]["count"] += 1
-            breakdown[key]["total_value"] += record.total_value
-            breakdown[key]["categories"][record.category] += 1
-            breakdown[key]["warehouses"][record.warehouse] += 1
+            entry = breakdown[period_key(record.timestamp)]
+            entry["count"] += 1
+            entry["total_value"] += record.total_value
+            categories = entry["categories"]
+            categories[record.category] = categories.get(record.category, 0) + 1
+            entry["warehouses"].add(record.warehouse)
 
         result = {}
-        for key in sorted(breakdown.keys()):
-            entry = breakdown[key]
+        # Period keys are unique, so sorting the items only ever compares
+        # keys; this sorts the handful of buckets, not the records.
+        for key, entry in sorted(breakdown.items()):
             result[key] = {
                 "count": entry["count"],
                 "total_value": round(entry["total_value"], 2),
-                "top_category": entry["categories"].most_common(1)[0][0]
-                    if entry["categories"] else None,
+                # max() keeps the first-inserted category on ties, the same
+                # pick Counter.most_common(1) made.
+                "top_category": max(
+                    entry["categories"], key=entry["categories"].get
+                ) if entry["categories"] else None,
                 "warehouse_spread": len(entry["warehouses"]),
             }
         return result
 
     @validate_non_empty
-    def find_duplicate_skus(self):
-        sku_map = defaultdict(list)
-        for record in self.records:
-            sku_map[record.sku].append(record)
-
+    def find_duplicate_skus(self, limit=None):
         duplicates = []
-        for sku, records in sku_map.items():
+        for sku, records in self.sku_index.items():
             if len(records) > 1:
                 duplicates.append({
                     "sku": sku,
@@ -479,19 +581,19 @@ class InventoryAnalyzer:
                     "total_quantity": sum(r.quantity for r in records),
                     "record_ids": [r.record_id for r in records],
                 })
-        return sorted(duplicates, key=lambda x: x["count"], reverse=True)
+        return self._top(duplicates, lambda x: x["count"], limit)
 
     @validate_non_empty
     def get_supplier_performance(self):
         performance = {}
         for supplier, records in self.supplier_index.items():
-            values = [r.total_value for r in records]
+            values = self.supplier_values[supplier]
             performance[supplier] = {
                 "record_count": len(records),
                 "total_value": round(sum(values), 2),
-                "avg_value": round(statistics.mean(values), 2),
-                "categories": list(set(r.category for r in records)),
-                "warehouses": list(set(r.warehouse for r in records)),
+                "avg_value": round(statistics.fmean(values), 2),
+                "categories": list(self.supplier_categories[supplier]),
+                "warehouses": list(self.supplier_warehouses[supplier]),
                 "error_rate": self._compute_supplier_error_rate(supplier),
             }
         return dict(sorted(
@@ -500,25 +602,52 @@ class InventoryAnalyzer:
             reverse=True
         ))
 
+    def _count_supplier_errors(self):
+        """Matches every error message against every supplier in one pass."""
+        messages = [e.get("error", "").lower() for e in self.errors]
+        needles = [(s, s.lower()) for s in self.supplier_index]
+        counts = dict.fromkeys(self.supplier_index, 0)
+        for message in messages:
+            for supplier, needle in needles:
+                if needle in message:
+                    counts[supplier] += 1
+        self._supplier_error_counts = counts
+
     def _compute_supplier_error_rate(self, supplier):
-        supplier_errors = [
-            e for e in self.errors
-            if supplier.lower() in e.get("error", "").lower()
-        ]
-        total = len(self.supplier_index.get(supplier, [])) + len(supplier_errors)
+        if not self._supplier_error_counts:
+            self._count_supplier_errors()
+        error_count = self._supplier_error_counts.get(supplier)
+        if error_count is None:
+            needle = supplier.lower()
+            error_count = sum(
+                1 for e in self.errors if needle in e.get("error", "").lower()
+            )
+        total = len(self.supplier_index.get(supplier, [])) + error_count
         if total == 0:
             return 0.0
-        return round(len(supplier_errors) / total * 100, 2)
+        return round(error_count / total * 100, 2)
+
+    @staticmethod
+    def _top(items, key, limit=None):
+        # nlargest matches sorted(..., reverse=True)[:limit], ties included,
+        # without sorting the whole list when only a few are kept.
+        if limit is None:
+            return sorted(items, key=key, reverse=True)
+        return heapq.nlargest(limit, items, key=key)
 
     @staticmethod
-    def _get_top_items(items, limit=5):
-        return [item for item, _ in Counter(items).most_common(limit)]
+    def _get_top_items(counts, limit=5):
+        return [item for item, _ in counts.most_common(limit)]
 
     @log_execution
     @validate_non_empty
     def generate_report(self):
-        valid_records = [r for r in self.records if r.is_valid_category()]
-        invalid_records = [r for r in self.records if not r.is_valid_category()]
+        if self._cached_report_version == self._version:
+            # Callers own the dict they get back, so each hit is a copy
+            # with its own generation time.
+            report = copy.deepcopy(self._cached_report)
+            report["metadata"]["generated_at"] = datetime.utcnow().isoformat()
+            return report
 
         report = {
             "metadata": {
@@ -528,24 +657,20 @@ class InventoryAnalyzer:
                 "total_errors": len(self.errors),
             },
             "summary": {
-                "valid_records": len(valid_records),
-                "invalid_records": len(invalid_records),
-                "total_inventory_value": round(
-                    sum(r.total_value for r in self.records), 2
-                ),
-                "high_value_items": sum(
-                    1 for r in self.records if r.is_high_value
-                ),
+                "valid_records": self.valid_count,
+                "invalid_records": len(self.records) - self.valid_count,
+                "total_inventory_value": round(self.total_inventory_value, 2),
+                "high_value_items": self.high_value_count,
                 "unique_categories": len(self.category_index),
                 "unique_warehouses": len(self.warehouse_index),
                 "unique_suppliers": len(self.supplier_index),
             },
             "category_analysis": self.get_category_summary(),
             "warehouse_analysis": self.get_warehouse_summary(),
-            "price_outliers": self.find_price_outliers()[:20],
+            "price_outliers": self.find_price_outliers(limit=20),
             "correlations": self.get_price_quantity_correlation(),
             "time_series": self.get_time_series_breakdown("monthly"),
-            "duplicate_skus": self.find_duplicate_skus()[:10],
+            "duplicate_skus": self.find_duplicate_skus(limit=10),
             "supplier_performance": self.get_supplier_performance(),
         }
 
@@ -566,6 +691,8 @@ class InventoryAnalyzer:
                 "sample_errors": [],
             }
 
+        self._cached_report = copy.deepcopy(report)
+        self._cached_report_version = self._version
         return report
 
 
@@ -597,28 +724,39 @@ def build_dataset(num_records=1000):
         "health": "HL", "toys": "TY", "sports": "SP", "garden": "GD",
     }
 
-    dataset = []
+    # Name fragments are fixed per category/supplier; format them once.
+    category_titles = {c: c.title() for c in categories}
+    supplier_short = {s: s.split()[0] for s in suppliers}
+
+    # Only 366 distinct timestamps and 10 price ranges can come out of the
+    # loop, so they are tabulated up front instead of per row.
     start_date = datetime(2024, 1, 1)
+    timestamps = [
+        (start_date + timedelta(days=day_offset)).strftime("%Y-%m-%d %H:%M:%S")
+        for day_offset in range(366)
+    ]
+    price_ranges = {
+        c: (base, -base * 0.4, base * 0.6) for c, base in base_prices.items()
+    }
+
+    dataset = []
 
     for i in range(num_records):
         category = random.choice(categories)
-        base = base_prices[category]
-        price = round(base + random.uniform(-base * 0.4, base * 0.6), 2)
+        base, low, high = price_ranges[category]
+        price = round(base + random.uniform(low, high), 2)
         quantity = random.randint(1, 200)
         warehouse = random.choice(warehouses)
         supplier = random.choice(suppliers)
         prefix = sku_prefixes[category]
 
-        day_offset = random.randint(0, 365)
-        timestamp = (start_date + timedelta(days=day_offset)).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
+        timestamp = timestamps[random.randint(0, 365)]
 
         sku = f"{prefix}-{10000 + i:06d}"
 
         dataset.append({
             "id": f"REC-{i + 1:06d}",
-            "name": f"{category.title()} {supplier.split()[0]} Item #{i + 1}",
+            "name": f"{category_titles[category]} {supplier_short[supplier]} Item #{i + 1}",
             "category": category,
             "price": f"${price}",
             "quantity": str(quantity),
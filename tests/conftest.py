@@ -0,0 +1,29 @@
+import sys
+import os
+
+import pytest
+
+# Ensure the repo root (where the core package lives) is on the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def nodes(tmp_path, monkeypatch):
+    """
+    core.nodes with artifacts written under tmp_path and empty patch caches.
+
+    Imported only after the chdir: core.logger creates artifacts/ in the
+    working directory on first import.
+    """
+    monkeypatch.chdir(tmp_path)
+    import core.nodes as nodes
+
+    nodes._artifact_dirs.cache_clear()
+    nodes._patch_db.cache_clear()
+    nodes._PATCH_CACHE.clear()
+    yield nodes
+    if nodes._patch_db.cache_info().currsize:
+        nodes._patch_db().close()
+    nodes._patch_db.cache_clear()
+    nodes._artifact_dirs.cache_clear()
+    nodes._PATCH_CACHE.clear()
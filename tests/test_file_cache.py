@@ -0,0 +1,50 @@
+import os
+
+from core import file_cache
+from core.file_cache import read_cached, write_cached
+
+
+def test_read_is_served_from_memory_while_unchanged(tmp_path, monkeypatch):
+    path = tmp_path / "app.py"
+    path.write_text("a = 1\n", encoding="utf-8")
+
+    assert read_cached(str(path)) == "a = 1\n"
+
+    # Rewrite the cached text behind the file's back: a second read that
+    # went to disk would not see it.
+    stat, size, _ = file_cache._CACHE[str(path)]
+    monkeypatch.setitem(file_cache._CACHE, str(path), (stat, size, "cached"))
+    assert read_cached(str(path)) == "cached"
+
+
+def test_read_sees_external_change(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("a = 1\n", encoding="utf-8")
+    read_cached(str(path))
+
+    path.write_text("a = 22\n", encoding="utf-8")
+
+    assert read_cached(str(path)) == "a = 22\n"
+
+
+def test_read_sees_same_size_change_with_new_mtime(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("a = 1\n", encoding="utf-8")
+    read_cached(str(path))
+
+    path.write_text("a = 2\n", encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert read_cached(str(path)) == "a = 2\n"
+
+
+def test_write_then_read(tmp_path, monkeypatch):
+    path = tmp_path / "app.py"
+
+    write_cached(str(path), "b = 2\n")
+
+    assert path.read_text(encoding="utf-8") == "b = 2\n"
+    # Served from the entry write_cached recorded, without opening the file.
+    monkeypatch.setattr("builtins.open", None)
+    assert read_cached(str(path)) == "b = 2\n"
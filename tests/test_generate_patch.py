@@ -0,0 +1,135 @@
+import pytest
+
+import core.llm_client as llm_client
+from core.state import OpsGuardState
+
+
+ORIGINAL = '''\
+import json
+
+
+class Loader:
+    def __init__(self, path):
+        self.path = path
+
+    def parse(self, value):
+        return int(value)
+
+    def dump(self, data):
+        return json.dumps(data)
+
+
+print(Loader("x").parse("abc"))
+'''
+
+FIXED_METHOD = '''\
+def parse(self, value):
+    try:
+        return int(value)
+    except ValueError:
+        return 0'''
+
+FIXED = ORIGINAL.replace(
+    "        return int(value)\n",
+    "        try:\n"
+    "            return int(value)\n"
+    "        except ValueError:\n"
+    "            return 0\n",
+)
+
+ERROR_LOG = '''\
+Traceback (most recent call last):
+  File "/app/app.py", line 15, in <module>
+    print(Loader("x").parse("abc"))
+  File "/app/app.py", line 9, in parse
+    return int(value)
+ValueError: invalid literal for int() with base 10: 'abc'
+'''
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """
+    Replaces the providers: NVIDIA answers with the fix (the whole file or
+    just the definition, whichever was asked for), Groq fails.
+    """
+    calls = []
+
+    def nvidia(messages, max_chars=None, model=None, cancel=None):
+        calls.append(messages)
+        if "Definition (lines" in messages[1]["content"]:
+            return FIXED_METHOD
+        return FIXED
+
+    def groq(messages, max_chars=None, model=None, cancel=None):
+        raise RuntimeError("groq unavailable")
+
+    monkeypatch.setattr(llm_client, "call_nvidia_llm", nvidia)
+    monkeypatch.setattr(llm_client, "call_groq_llm", groq)
+    return calls
+
+
+def make_state(tmp_path, **fields):
+    workspace = tmp_path / "workspace"
+    workspace.mkdir(exist_ok=True)
+    entry_file = fields.get("entry_file", "app.py")
+    (workspace / entry_file).write_text(ORIGINAL, encoding="utf-8")
+    return OpsGuardState(
+        repo_path=str(tmp_path),
+        workspace_path=str(workspace),
+        error_log=ERROR_LOG,
+        **fields,
+    )
+
+
+def test_whole_file_prompt(nodes, llm_calls, tmp_path):
+    state = nodes.generate_patch_node(make_state(tmp_path))
+
+    assert state.patch_content == FIXED.strip()
+    assert state.patch_model == llm_client.NVIDIA_MODEL
+    assert state.patch_cache_key is not None
+    assert "File:\n" + ORIGINAL in llm_calls[0][1]["content"]
+
+
+def test_definition_prompt_is_spliced_back(nodes, llm_calls, tmp_path, monkeypatch):
+    monkeypatch.setattr(nodes, "_LOCALIZE_MIN_CHARS", 0)
+
+    state = nodes.generate_patch_node(make_state(tmp_path))
+
+    assert state.patch_content == FIXED
+    prompt = llm_calls[0][1]["content"]
+    assert "Definition (lines 8-9):\ndef parse(self, value):\n    return int(value)\n" in prompt
+    assert "json.dumps" not in prompt
+
+
+def test_cache_hit_skips_llm_and_restores_model(nodes, llm_calls, tmp_path):
+    state = nodes.generate_patch_node(make_state(tmp_path))
+    nodes._store_patch(state.patch_cache_key, state.patch_content, state.patch_model)
+    llm_calls.clear()
+
+    replay = nodes.generate_patch_node(make_state(tmp_path))
+
+    assert llm_calls == []
+    assert replay.patch_content == state.patch_content
+    assert replay.patch_model == llm_client.NVIDIA_MODEL
+    assert replay.patch_cache_key == state.patch_cache_key
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"entry_file": "main.py"},
+        {"verification_mode": "pytest"},
+        {"prompt_kind": "definition"},
+    ],
+)
+def test_cache_key_covers_prompt_inputs(nodes, llm_calls, tmp_path, monkeypatch, fields):
+    base = nodes.generate_patch_node(make_state(tmp_path)).patch_cache_key
+
+    fields = dict(fields)
+    if fields.pop("prompt_kind", None) == "definition":
+        monkeypatch.setattr(nodes, "_LOCALIZE_MIN_CHARS", 0)
+    changed = nodes.generate_patch_node(make_state(tmp_path, **fields)).patch_cache_key
+
+    assert changed is not None
+    assert changed != base
@@ -0,0 +1,120 @@
+import sqlite3
+
+from core.state import OpsGuardState, Status
+
+
+KEY = "0123456789abcdef0123456789abcdef"
+PATCH = "def parse(value):\n    return 0\n"
+MODEL = "meta/llama-3.1-70b-instruct"
+
+
+def make_state(exit_code, **fields):
+    return OpsGuardState(**{
+        "repo_path": ".",
+        "error_log": "ValueError",
+        "patch_content": PATCH,
+        "patch_model": MODEL,
+        "patch_cache_key": KEY,
+        "fix_result": {"exit_code": exit_code, "stdout": "", "stderr": ""},
+        **fields,
+    })
+
+
+def stored_rows(nodes):
+    return nodes._patch_db().execute("SELECT key, patch, model FROM patches").fetchall()
+
+
+# ============================================================
+# fix_decision_node
+# ============================================================
+
+def test_verified_fix_is_stored(nodes):
+    state = nodes.fix_decision_node(make_state(exit_code=0))
+
+    assert state.status == Status.SUCCESS
+    assert stored_rows(nodes) == [(KEY, PATCH, MODEL)]
+    assert nodes._load_cached_patch(KEY) == (PATCH, MODEL)
+
+
+def test_failed_fix_is_not_stored(nodes):
+    state = nodes.fix_decision_node(make_state(exit_code=1))
+
+    assert state.fix_retries == 1
+    assert stored_rows(nodes) == []
+    assert nodes._load_cached_patch(KEY) is None
+
+
+def test_patch_without_key_is_not_stored(nodes):
+    nodes.fix_decision_node(make_state(exit_code=0, patch_cache_key=None))
+
+    assert stored_rows(nodes) == []
+
+
+def test_failed_replay_forgets_cached_patch(nodes):
+    nodes._store_patch(KEY, PATCH, MODEL)
+
+    nodes.fix_decision_node(make_state(exit_code=1))
+
+    assert KEY not in nodes._PATCH_CACHE
+    assert stored_rows(nodes) == []
+    assert nodes._load_cached_patch(KEY) is None
+
+
+# ============================================================
+# On-disk cache
+# ============================================================
+
+def test_stored_patch_survives_a_new_process(nodes):
+    nodes._store_patch(KEY, PATCH, MODEL)
+    # A new CLI run starts with an empty in-process LRU.
+    nodes._PATCH_CACHE.clear()
+
+    assert nodes._load_cached_patch(KEY) == (PATCH, MODEL)
+
+
+def test_expired_patch_is_ignored_and_pruned(nodes, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(nodes.time, "time", lambda: now)
+    nodes._store_patch(KEY, PATCH, MODEL)
+    nodes._PATCH_CACHE.clear()
+
+    now += nodes._PATCH_DB_TTL_SECONDS - 1
+    assert nodes._load_cached_patch(KEY) == (PATCH, MODEL)
+    nodes._PATCH_CACHE.clear()
+
+    now += 2
+    assert nodes._load_cached_patch(KEY) is None
+
+    nodes._store_patch("f" * 32, PATCH, MODEL)
+    assert [row[0] for row in stored_rows(nodes)] == ["f" * 32]
+
+
+def test_lru_evicts_least_recently_used(nodes, monkeypatch):
+    monkeypatch.setattr(nodes, "_PATCH_CACHE_SIZE", 2)
+    nodes._remember_patch("a", PATCH, MODEL)
+    nodes._remember_patch("b", PATCH, MODEL)
+    nodes._load_cached_patch("a")
+    nodes._remember_patch("c", PATCH, MODEL)
+
+    assert list(nodes._PATCH_CACHE) == ["a", "c"]
+
+
+def test_table_without_model_column_is_upgraded(nodes, tmp_path):
+    internal_dir = tmp_path / "artifacts" / "internal"
+    internal_dir.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(internal_dir / "llm_cache.sqlite")
+    db.execute(
+        "CREATE TABLE patches "
+        "(key TEXT PRIMARY KEY, patch TEXT NOT NULL, created_at REAL NOT NULL)"
+    )
+    db.execute(
+        "INSERT INTO patches VALUES (?, ?, ?)",
+        (KEY, PATCH, nodes.time.time()),
+    )
+    db.commit()
+    db.close()
+
+    assert nodes._load_cached_patch(KEY) == (PATCH, None)
+
+    nodes._store_patch(KEY, PATCH, MODEL)
+    assert stored_rows(nodes) == [(KEY, PATCH, MODEL)]
@@ -0,0 +1,139 @@
+import difflib
+import random
+import re
+
+import pytest
+
+from core.patch_engine import (
+    _diff_opcodes,
+    _unified_diff,
+    apply_full_file_patch,
+    trim_common_lines,
+)
+
+
+_HUNK_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@$")
+
+
+def apply_unified_diff(original_lines: list, diff: list) -> list:
+    """
+    Minimal `patch`: applies lineterm="" unified diff lines, checking every
+    context and removed line and every hunk header count.
+    """
+    result = []
+    position = 0
+    index = 2  # skip the ---/+++ header
+    while index < len(diff):
+        match = _HUNK_RE.match(diff[index])
+        assert match, diff[index]
+        old_start, old_len, new_start, new_len = (
+            int(group) if group is not None else 1 for group in match.groups()
+        )
+        # An empty range names the line before the hunk.
+        hunk_start = old_start if old_len == 0 else old_start - 1
+        assert hunk_start >= position
+        result.extend(original_lines[position:hunk_start])
+        position = hunk_start
+        assert len(result) == (new_start if new_len == 0 else new_start - 1)
+
+        index += 1
+        old_seen = new_seen = 0
+        while index < len(diff) and not diff[index].startswith("@@"):
+            tag, line = diff[index][0], diff[index][1:]
+            if tag in " -":
+                assert original_lines[position] == line
+                position += 1
+                old_seen += 1
+            if tag in " +":
+                result.append(line)
+                new_seen += 1
+            index += 1
+        assert (old_seen, new_seen) == (old_len, new_len)
+
+    result.extend(original_lines[position:])
+    return result
+
+
+def random_edit(rng: random.Random, lines: list) -> list:
+    lines = list(lines)
+    for _ in range(rng.randint(1, 4)):
+        at = rng.randint(0, len(lines))
+        action = rng.choice(("insert", "delete", "replace"))
+        if action == "insert" or not lines:
+            lines[at:at] = [rng.choice(LINE_POOL) for _ in range(rng.randint(1, 3))]
+        elif action == "delete":
+            del lines[at:at + rng.randint(1, 3)]
+        else:
+            lines[at:at + 1] = [rng.choice(LINE_POOL)]
+    return lines
+
+
+# Few distinct lines, so files repeat lines the way real code does
+# (blank lines, `return`, closing brackets).
+LINE_POOL = ["", "    return x", ")", "x = 1", "def f():", "    pass", "# note"]
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_diff_applies_back_to_new_file(seed):
+    rng = random.Random(seed)
+    original = [rng.choice(LINE_POOL) for _ in range(rng.randint(0, 40))]
+    new = random_edit(rng, original)
+
+    diff = _unified_diff(original, new, _diff_opcodes(original, new), "a/f", "b/f")
+
+    if original == new:
+        assert diff == []
+    else:
+        assert diff[:2] == ["--- a/f", "+++ b/f"]
+        assert apply_unified_diff(original, diff) == new
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_formatter_matches_difflib_for_same_opcodes(seed):
+    rng = random.Random(seed)
+    original = [rng.choice(LINE_POOL) for _ in range(rng.randint(0, 40))]
+    new = random_edit(rng, original)
+
+    opcodes = difflib.SequenceMatcher(None, original, new).get_opcodes()
+
+    assert _unified_diff(original, new, opcodes, "a/f", "b/f") == list(
+        difflib.unified_diff(original, new, "a/f", "b/f", lineterm="")
+    )
+
+
+def test_trim_common_lines():
+    original = ["a", "b", "c", "d"]
+    assert trim_common_lines(original, ["a", "x", "d"]) == (1, 3, 2)
+    assert trim_common_lines(original, original) == (4, 4, 4)
+    # The prefix wins when a line could belong to either side.
+    assert trim_common_lines(["a", "a"], ["a"]) == (1, 2, 1)
+
+
+def test_apply_full_file_patch(tmp_path):
+    path = tmp_path / "app.py"
+    path.write_text("a = 1\nb = 2\nc = 3\n", encoding="utf-8")
+
+    result = apply_full_file_patch(str(tmp_path), "app.py", "a = 1\nb = 20\nc = 3\n")
+
+    assert result["success"] is True
+    assert result["diff"].splitlines()[2:] == [
+        "@@ -1,3 +1,3 @@", " a = 1", "-b = 2", "+b = 20", " c = 3",
+    ]
+    assert result["changed_blocks"] == [
+        {"line_number": 2, "before": "b = 2", "after": "b = 20"}
+    ]
+    assert path.read_text(encoding="utf-8") == "a = 1\nb = 20\nc = 3\n"
+
+
+def test_apply_full_file_patch_without_changes(tmp_path):
+    (tmp_path / "app.py").write_text("a = 1\n", encoding="utf-8")
+
+    result = apply_full_file_patch(str(tmp_path), "app.py", "a = 1\n")
+
+    assert result == {"success": True, "diff": "", "changed_blocks": []}
+
+
+def test_apply_full_file_patch_missing_file(tmp_path):
+    result = apply_full_file_patch(str(tmp_path), "app.py", "a = 1\n")
+
+    assert result["success"] is False